@@ -0,0 +1,119 @@
+import numpy as np
+
+# 事件代码
+EV_STEP = 0          # 每步控制轨迹
+EV_SCRAM = 1         # SCRAM 触发
+EV_MODE_SWITCH = 2   # 控制模式切换（如 PID 异常 → MPC）
+EV_ERROR = 3         # 控制更新异常，使用 fallback
+EV_SETPOINT = 4      # 外部设定值更新
+
+# 严重程度（与 logging 数值一致）
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+SEVERITY = {EV_STEP: DEBUG, EV_SCRAM: WARNING, EV_MODE_SWITCH: WARNING, EV_ERROR: ERROR, EV_SETPOINT: INFO}
+SEVERITY_NAMES = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "ERROR": ERROR}
+
+MODES = ['pid', 'mpc', 'fallback']
+
+_FIELDS = [
+    ("step", np.int64), ("mode", np.int8), ("T_out", np.float64),
+    ("U", np.float64), ("rho", np.float64), ("scram", np.bool_), ("code", np.int8),
+]
+
+
+class _Ring:
+    """预分配的列式环形缓冲区，写满后覆盖最旧记录"""
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self.cols = {name: np.zeros(self.capacity, dtype=dtype) for name, dtype in _FIELDS}
+        self.total = 0
+
+    def append(self, step, mode, T_out, U, rho, scram, code):
+        i = self.total % self.capacity
+        c = self.cols
+        c["step"][i] = step
+        c["mode"][i] = mode
+        c["T_out"][i] = T_out
+        c["U"][i] = U
+        c["rho"][i] = rho
+        c["scram"][i] = scram
+        c["code"][i] = code
+        self.total += 1
+        return i
+
+    def ordered(self):
+        """按写入顺序返回有效记录的下标"""
+        n = min(self.total, self.capacity)
+        start = self.total % self.capacity if self.total > self.capacity else 0
+        return (start + np.arange(n)) % self.capacity
+
+
+class ControlEventLog:
+    """
+    结构化、有界的控制日志
+
+    - 每步控制轨迹写入定长环形缓冲区（只保留最近 capacity 步）
+    - 非例行事件（SCRAM、模式切换、异常、设定值更新）另存一个环形缓冲区，不被轨迹覆盖
+    - 记录时不构造字符串；文本只在 export() 时按严重程度过滤后格式化
+    """
+
+    def __init__(self, capacity=100000, event_capacity=10000):
+        self.trace = _Ring(capacity)
+        self.events = _Ring(event_capacity)
+        self.messages = {}   # 事件缓冲区下标 → 附加说明（仅异常等少数事件）
+
+    def record(self, step, mode, T_out, U, rho, scram, code=EV_STEP, message=None):
+        mode_id = MODES.index(mode) if mode in MODES else len(MODES) - 1
+        if code == EV_STEP:
+            self.trace.append(step, mode_id, T_out, U, rho, scram, code)
+            return
+        i = self.events.append(step, mode_id, T_out, U, rho, scram, code)
+        if message is not None:
+            self.messages[i] = message
+        elif i in self.messages:
+            del self.messages[i]
+
+    def __len__(self):
+        return self.trace.total + self.events.total
+
+    def to_arrays(self, min_severity=DEBUG):
+        """
+        返回按步号排序的列式记录 {字段: ndarray}（附 'message' 列表）
+        """
+        parts, msgs = [], []
+        if min_severity <= DEBUG:
+            idx = self.trace.ordered()
+            parts.append({k: v[idx] for k, v in self.trace.cols.items()})
+            msgs += [None] * len(idx)
+        idx = self.events.ordered()
+        sev = np.array([SEVERITY[c] for c in self.events.cols["code"][idx]], dtype=int)
+        idx = idx[sev >= min_severity]
+        parts.append({k: v[idx] for k, v in self.events.cols.items()})
+        msgs += [self.messages.get(i) for i in idx]
+
+        out = {name: np.concatenate([p[name] for p in parts]) for name, _ in _FIELDS}
+        order = np.argsort(out["step"], kind='stable')
+        out = {k: v[order] for k, v in out.items()}
+        out["message"] = [msgs[i] for i in order]
+        return out
+
+    @staticmethod
+    def format(step, mode, T_out, U, rho, scram, code, message=None):
+        mode = MODES[mode]
+        if code == EV_SCRAM:
+            return f"[Step {step}] ⚠️ SCRAM triggered → T_out={T_out:.2f}K → ρ={rho:.2f}"
+        if code == EV_MODE_SWITCH:
+            return f"[Step {step}] ⚠️ PID anomaly detected, switching to {mode.upper()} mode."
+        if code == EV_ERROR:
+            return f"[Step {step}] ❗ Control update error: {message} → fallback U={U:.0f}"
+        if code == EV_SETPOINT:
+            return f"[Step {step}] Setpoints updated → {message}"
+        return f"[Step {step}] Mode={mode}, T_out={T_out:.1f}, U={U:.1f}, ρ={'SCRAM' if scram else f'{rho:.5f}'}"
+
+    def lines(self, min_severity="INFO"):
+        if isinstance(min_severity, str):
+            min_severity = SEVERITY_NAMES[min_severity.upper()]
+        rec = self.to_arrays(min_severity)
+        for i in range(len(rec["step"])):
+            yield self.format(int(rec["step"][i]), int(rec["mode"][i]), rec["T_out"][i], rec["U"][i],
+                              rec["rho"][i], bool(rec["scram"][i]), int(rec["code"][i]), rec["message"][i])
@@ -1,3 +1,5 @@
+import numpy as np
+
 class BooleanController:
     """
     简单布尔控制器：根据某个物理变量是否超出阈值激活或关闭模块
@@ -21,3 +23,37 @@ class BooleanController:
         elif not self.hold_state:
             self.active = False
         return self.active
+
+
+class BooleanBank:
+    """
+    向量化布尔控制器组：对多个回路同时做阈值判断（语义同 BooleanController）
+
+    threshold / mode / hold_state 可为标量或数组；mode 取 'greater' 或 'less'
+    """
+
+    def __init__(self, threshold, mode='greater', hold_state=True, shape=None):
+        threshold = np.asarray(threshold, dtype=float)
+        greater = np.asarray(mode) == 'greater'
+        hold_state = np.asarray(hold_state, dtype=bool)
+        self.shape = np.broadcast_shapes(threshold.shape, greater.shape, hold_state.shape,
+                                         () if shape is None else tuple(np.atleast_1d(shape)))
+        self.threshold = np.broadcast_to(threshold, self.shape).copy()
+        self.greater = np.broadcast_to(greater, self.shape).copy()
+        self.hold_state = np.broadcast_to(hold_state, self.shape).copy()
+        self.active = np.zeros(self.shape, dtype=bool)
+
+    def update(self, value):
+        """
+        输入各回路当前变量值数组，输出激活状态布尔数组
+        """
+        value = np.asarray(value, dtype=float)
+        hit = np.where(self.greater, value > self.threshold, value < self.threshold)
+        self.active = hit | (self.active & self.hold_state)
+        return self.active
+
+    def reset(self, mask=None):
+        if mask is None:
+            self.active[...] = False
+        else:
+            self.active &= ~np.broadcast_to(mask, self.shape)
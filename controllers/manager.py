@@ -1,20 +1,36 @@
 from controllers.pid import IncrementalPID
 from controllers.logic import BooleanController
 from controllers.mpc import MPCController
+from controllers.event_log import (ControlEventLog, EV_STEP, EV_SCRAM, EV_MODE_SWITCH,
+                                   EV_ERROR, EV_SETPOINT)
 
 class ControlManager:
-    def __init__(self, dt):
+    def __init__(self, dt, T_ref=950.0, n_ref=1.0, cfg=None, log_capacity=100000):
         self.dt = dt
+        cfg = cfg or {}
 
-        # 控制器初始化
-        self.pid_temp = IncrementalPID(Kp=2000, Ti=50, Td=300, dt=dt, limits=(1000, 20000))
-        self.pid_rho = IncrementalPID(Kp=500, Ti=100, Td=10, dt=dt, limits=(-0.01, 0.01))
-        self.mpc_U = MPCController(horizon=10, dt=dt)
+        # 设定值：整体替换以保证 T_ref / n_ref 同时生效
+        self.setpoints = {"T_ref": T_ref, "n_ref": n_ref}
+
+        # 控制器初始化：增益取自输入卡 control.pid_temp / control.pid_rho，缺省为原整定值
+        self.pid_temp = self._make_pid(cfg.get('pid_temp'), dict(Kp=2000, Ti=50, Td=300, limits=(1000, 20000)))
+        self.pid_rho = self._make_pid(cfg.get('pid_rho'), dict(Kp=500, Ti=100, Td=10, limits=(-0.01, 0.01)))
+        # MPC：时域与模型参数取自输入卡 control.mpc，U 约束与温度 PID 一致
+        mpc_cfg = dict(cfg.get('mpc', {}))
+        mpc_cfg.setdefault('limits', tuple(cfg.get('pid_temp', {}).get('limits', self.pid_temp.limits)))
+        self.mpc_U = MPCController(dt=dt, **mpc_cfg)
 
         self.scram_logic = BooleanController(threshold=1200, mode='greater')  # SCRAM触发温度
 
-        self.control_mode = 'pid'  # 默认使用 PID
-        self.log = []
+        self.control_mode = str(cfg.get('controller_type', 'pid')).lower()  # 默认使用 PID
+        self.log = ControlEventLog(capacity=log_capacity)  # 结构化有界日志，导出时才格式化文本
+        self._scram_prev = False
+
+    def _make_pid(self, pid_cfg, defaults):
+        gains = dict(defaults)
+        gains.update({k: v for k, v in (pid_cfg or {}).items() if k in defaults})
+        gains['limits'] = tuple(gains['limits']) if gains['limits'] is not None else None
+        return IncrementalPID(dt=self.dt, **gains)
 
     def update(self, sensors: dict, step: int):
         """
@@ -24,16 +40,18 @@ class ControlManager:
         返回：
         - {"U": ..., "rho": ..., "scram": ...}
         """
+        setpoints = self.setpoints
         T_out = sensors.get("T_out", 900)
-        T_ref = sensors.get("T_ref", 900)
+        T_ref = sensors.get("T_ref", setpoints["T_ref"])
         n = sensors.get("n", 1.0)
-        n_ref = sensors.get("n_ref", 1.0)
+        n_ref = sensors.get("n_ref", setpoints["n_ref"])
 
         # 1️⃣ SCRAM 判断
         scram = self.scram_logic.update(T_out)
         if scram:
             rho = -0.01
-            self.log.append(f"[Step {step}] ⚠️ SCRAM triggered → T_out={T_out:.2f}K → ρ=-0.01")
+            if not self._scram_prev:
+                self.log.record(step, self.control_mode, T_out, 0.0, rho, True, EV_SCRAM)
         else:
             error_n = n - n_ref
             rho = self.pid_rho.update(error_n)
@@ -46,8 +64,9 @@ class ControlManager:
 
                 # 故障识别（输出震荡或超幅度变化）
                 if abs(U - self.pid_temp.u) > 1000:
-                    self.log.append(f"[Step {step}] ⚠️ PID anomaly detected, switching to MPC mode.")
                     self.control_mode = 'mpc'
+                    self.log.record(step, self.control_mode, T_out, U, rho, scram, EV_MODE_SWITCH)
+                    self.mpc_U.reset(u_prev=U)  # 无扰切换
 
             elif self.control_mode == 'mpc':
                 U = self.mpc_U.update(sensors, ref=T_ref)
@@ -57,19 +76,31 @@ class ControlManager:
 
         except Exception as e:
             U = 15000
-            self.log.append(f"[Step {step}] ❗ Control update error: {e} → fallback U=15000")
+            self.log.record(step, self.control_mode, T_out, U, rho, scram, EV_ERROR, message=repr(e))
 
-        # 3️⃣ 日志输出
-        self.log.append(
-            f"[Step {step}] Mode={self.control_mode}, T_out={T_out:.1f}, U={U:.1f}, ρ={'SCRAM' if scram else f'{rho:.5f}'}"
-        )
+        # 3️⃣ 日志记录（仅写入预分配数组）
+        self.log.record(step, self.control_mode, T_out, U, rho, scram, EV_STEP)
+        self._scram_prev = scram
 
         return {"U": U, "rho": rho, "scram": scram}
 
-    def export_log(self, filepath="control_log.txt"):
+    def apply_setpoints(self, new_setpoints: dict, step=None):
+        """
+        运行中更新设定值（如来自 GUI 的 external_input.json）
+        新字典构建完成后一次性替换，update() 不会看到半更新状态
+        """
+        merged = dict(self.setpoints)
+        merged.update({k: v for k, v in new_setpoints.items() if k in merged})
+        self.setpoints = merged
+        self.log.record(step if step is not None else -1, self.control_mode, float('nan'), float('nan'),
+                        float('nan'), False, EV_SETPOINT,
+                        message=f"T_ref={merged['T_ref']:.1f}, n_ref={merged['n_ref']:.3f}")
+
+    def export_log(self, filepath="control_log.txt", min_severity="DEBUG"):
         """
         导出日志到文件
+        min_severity: DEBUG 包含每步控制轨迹；INFO / WARNING / ERROR 只导出对应级别以上的事件
         """
         with open(filepath, 'w', encoding='utf-8') as f:
-            for line in self.log:
+            for line in self.log.lines(min_severity):
                 f.write(line + '\n')
@@ -1,16 +1,163 @@
 import numpy as np
 
+
 class MPCController:
     """
-    简易模型预测控制器接口（占位模板）
-    用于未来集成线性 / 非线性 MPC，优化换热、流量、反应性等
+    线性模型预测控制器（换热强度 U → 出口温度 T_out）
+
+    预测模型：在 (n0, T0, U0) 处线性化的单群点堆动力学 + 一阶出口温度动力学
+        δn' = -(β/Λ) δn + λ δc
+        δc' =  (β/Λ) δn - λ δc
+        δT' = (K_n δn - δT + K_U δU) / τ_T
+    零阶保持离散化后构造压缩（condensed）预测矩阵 Y = Φ x0 + Γ u，
+    代价 J = Σ Q (y - r)^2 + Σ R (Δu)^2，控制时域 Nc 之后输入保持不变
+
+    每个时域组合 (Np, Nc) 的预测矩阵与 Hessian 逆只计算一次并缓存；
+    每步只做小矩阵乘法：无约束解落在 limits 内直接采用，
+    否则从上一步解平移后的热启动点做投影梯度（FISTA）迭代
+    出口温度采用输出扰动估计（实测 - 模型预测）实现无静差
     """
 
-    def __init__(self, horizon=10, dt=1.0):
+    def __init__(self, horizon=10, dt=1.0, prediction_horizon=None, control_horizon=None,
+                 limits=(1000, 20000), U0=15000.0, Q=1.0, R=1e-6,
+                 beta=0.0065, lambda_eff=0.08, Lambda=1e-4,
+                 tau_T=30.0, K_n=50.0, K_U=-0.01,
+                 max_iter=100, tol=1e-6):
         self.horizon = horizon
         self.dt = dt
+        self.Np = int(prediction_horizon or horizon)
+        self.Nc = int(min(control_horizon or self.Np, self.Np))
+        self.limits = limits
+        self.U0 = float(U0)
+        self.Q = float(Q)
+        self.R = float(R)
+        self.max_iter = max_iter
+        self.tol = tol
         self.ref = 0.0
 
+        # 线性化工作点（首次 update 时取实测值）
+        self.n0 = None
+        self.T0 = None
+        self.c_gain = beta / (lambda_eff * Lambda)   # 准稳态 δc / δn
+
+        A = np.array([
+            [-beta / Lambda, lambda_eff, 0.0],
+            [beta / Lambda, -lambda_eff, 0.0],
+            [K_n / tau_T, 0.0, -1.0 / tau_T],
+        ])
+        B = np.array([0.0, 0.0, K_U / tau_T])
+        self.Ad, self.Bd = self._discretize(A, B, dt)
+        self.C = np.array([0.0, 0.0, 1.0])
+
+        self._cache = {}
+        self.reset()
+
+    @staticmethod
+    def _expm(M, order=14):
+        """
+        小型稠密矩阵指数（缩放-平方 + Taylor 级数），避免为 4x4 矩阵导入 scipy
+        缩放至 ‖M‖ ≤ 0.5 后截断误差约 0.5^15 / 15! ，远低于双精度舍入
+        """
+        norm = np.linalg.norm(M, 1)
+        s = max(0, int(np.ceil(np.log2(norm / 0.5)))) if norm > 0 else 0
+        X = M / 2.0 ** s
+        E = np.eye(M.shape[0])
+        term = np.eye(M.shape[0])
+        for k in range(1, order + 1):
+            term = term @ X / k
+            E = E + term
+        for _ in range(s):
+            E = E @ E
+        return E
+
+    @classmethod
+    def _discretize(cls, A, B, dt):
+        """零阶保持离散化：expm([[A, B], [0, 0]] dt)"""
+        n = A.shape[0]
+        M = np.zeros((n + 1, n + 1))
+        M[:n, :n] = A
+        M[:n, n] = B
+        E = cls._expm(M * dt)
+        return E[:n, :n], E[:n, n]
+
+    def _matrices(self, Np, Nc):
+        """
+        预计算（并缓存）时域 (Np, Nc) 的压缩 QP 矩阵：
+        g = Gx x0 + Gr r + Gu u_prev,  u* = -H^{-1} g
+        """
+        key = (Np, Nc)
+        if key in self._cache:
+            return self._cache[key]
+
+        nx = self.Ad.shape[0]
+        Phi = np.zeros((Np, nx))
+        Gamma = np.zeros((Np, Nc))
+        Ak = np.eye(nx)
+        AkB = []  # C A^k B, k = 0..Np-1
+        for k in range(Np):
+            AkB.append(self.C @ Ak @ self.Bd)
+            Ak = self.Ad @ Ak
+            Phi[k] = self.C @ Ak
+        for k in range(Np):
+            for j in range(k + 1):
+                Gamma[k, min(j, Nc - 1)] += AkB[k - j]
+
+        # Δu = D u - e1 u_prev
+        D = np.eye(Nc) - np.eye(Nc, k=-1)
+        e1 = np.zeros(Nc)
+        e1[0] = 1.0
+
+        H = self.Q * Gamma.T @ Gamma + self.R * D.T @ D
+        L = np.linalg.cholesky(H)
+        L_inv = np.linalg.inv(L)
+        mats = {
+            "Phi": Phi,
+            "H": H,
+            "H_inv": L_inv.T @ L_inv,
+            "Gx": self.Q * Gamma.T @ Phi,
+            "Gr": -self.Q * Gamma.T @ np.ones(Np),
+            "Gu": -self.R * D.T @ e1,
+            "step": 1.0 / np.linalg.eigvalsh(H)[-1],
+        }
+        self._cache[key] = mats
+        return mats
+
+    def set_horizon(self, prediction_horizon, control_horizon=None):
+        self.Np = int(prediction_horizon)
+        self.Nc = int(min(control_horizon or self.Np, self.Np))
+        self.u_seq = np.zeros(self.Nc)
+
+    def reset(self, u_prev=None):
+        """
+        重置内部状态（如由 PID 切换到 MPC 时，以当前 U 作为无扰切换初值）
+        """
+        self.u_prev = 0.0 if u_prev is None else float(u_prev) - self.U0
+        self.u_seq = np.full(self.Nc, self.u_prev)
+        self.xm = None
+        self.iterations = 0
+
+    def _solve(self, mats, g, lb, ub):
+        u = -mats["H_inv"] @ g
+        if np.all(u >= lb) and np.all(u <= ub):
+            self.iterations = 0
+            return u
+
+        # 热启动：上一步解平移一拍，末项重复
+        x = np.clip(np.append(self.u_seq[1:], self.u_seq[-1]), lb, ub)
+        y, t = x.copy(), 1.0
+        H, step = mats["H"], mats["step"]
+        it = -1   # max_iter=0 时直接返回投影后的热启动解
+        for it in range(self.max_iter):
+            x_new = np.clip(y - step * (H @ y + g), lb, ub)
+            if np.max(np.abs(x_new - x)) <= self.tol * (1.0 + np.max(np.abs(x))):
+                x = x_new
+                break
+            t_new = 0.5 * (1.0 + np.sqrt(1.0 + 4.0 * t * t))
+            y = x_new + (t - 1.0) / t_new * (x_new - x)
+            x, t = x_new, t_new
+        self.iterations = it + 1
+        return x
+
     def update(self, state, ref=None):
         """
         输入当前状态和可选参考值，返回控制指令（如换热强度 U）
@@ -21,8 +168,26 @@ class MPCController:
         if ref is not None:
             self.ref = ref
 
-        # ⚠️ 占位策略：线性预测 + P 控制（未来可替换为优化器）
         T = state.get("T_out", 900)
-        error = T - self.ref
-        U = max(0, 15000 - 500 * error)  # 仅作占位演示
-        return U
+        n = state.get("n", 1.0)
+        if self.n0 is None:
+            self.n0, self.T0 = n, T
+
+        # 中子状态取实测（前体取准稳态），温度状态由模型递推，偏差作为输出扰动
+        dn = n - self.n0
+        if self.xm is None:
+            self.xm = np.array([dn, self.c_gain * dn, T - self.T0])
+        else:
+            self.xm = self.Ad @ self.xm + self.Bd * self.u_prev
+            self.xm[0], self.xm[1] = dn, self.c_gain * dn
+        d = (T - self.T0) - self.xm[2]
+
+        mats = self._matrices(self.Np, self.Nc)
+        r = (self.ref - self.T0) - d
+        g = mats["Gx"] @ self.xm + mats["Gr"] * r + mats["Gu"] * self.u_prev
+
+        lb = self.limits[0] - self.U0 if self.limits else -np.inf
+        ub = self.limits[1] - self.U0 if self.limits else np.inf
+        self.u_seq = self._solve(mats, g, lb, ub)
+        self.u_prev = float(self.u_seq[0])
+        return self.U0 + self.u_prev
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class IncrementalPID:
     """
     增量式 PID 控制器（参考式 3.56），支持防积分饱和
@@ -35,3 +38,68 @@ class IncrementalPID:
         return self.u
 
 
+class PIDBank:
+    """
+    向量化增量式 PID 控制器组：同时更新多个回路（如不确定性分析的集合仿真、多换热回路）
+
+    Kp / Ti / Td / u_init / limits 可为标量或数组，按广播规则决定回路形状；
+    状态 e_prev / e_prev2 / u 均为数组，一次数组运算更新所有回路
+    防积分饱和语义与 IncrementalPID 相同：增量累加后对 u 本身限幅
+    """
+
+    def __init__(self, Kp, Ti, Td, dt, u_init=0.0, limits=None, shape=None):
+        Kp = np.asarray(Kp, dtype=float)
+        Ti = np.asarray(Ti, dtype=float)
+        Td = np.asarray(Td, dtype=float)
+        lo, hi = (-np.inf, np.inf) if limits is None else limits
+        lo = np.asarray(lo, dtype=float)
+        hi = np.asarray(hi, dtype=float)
+        self.shape = np.broadcast_shapes(Kp.shape, Ti.shape, Td.shape, np.shape(u_init),
+                                         lo.shape, hi.shape, () if shape is None else tuple(np.atleast_1d(shape)))
+        self.dt = dt
+        self.Kp = np.broadcast_to(Kp, self.shape).copy()
+        self.Ti = np.broadcast_to(Ti, self.shape).copy()
+        self.Td = np.broadcast_to(Td, self.shape).copy()
+        self.lo = np.broadcast_to(lo, self.shape).copy()
+        self.hi = np.broadcast_to(hi, self.shape).copy()
+
+        # 增量公式系数：Δu = k0·e + k1·e_prev + k2·e_prev2
+        self.k0 = self.Kp * (1.0 + dt / self.Ti + self.Td / dt)
+        self.k1 = -self.Kp * (1.0 + 2.0 * self.Td / dt)
+        self.k2 = self.Kp * self.Td / dt
+
+        self.e_prev = np.zeros(self.shape)
+        self.e_prev2 = np.zeros(self.shape)
+        self.u = np.broadcast_to(np.asarray(u_init, dtype=float), self.shape).copy()
+
+    def update(self, e, trip=None, trip_value=None):
+        """
+        输入各回路误差数组 e，返回各回路输出 u
+
+        trip: 可选布尔数组（如 BooleanBank 输出），为 True 的回路冻结 PID 状态，
+              输出取 trip_value（未给出时保持上一步输出）
+        """
+        e = np.broadcast_to(np.asarray(e, dtype=float), self.shape)
+        u_new = self.u + self.k0 * e + self.k1 * self.e_prev + self.k2 * self.e_prev2
+        np.clip(u_new, self.lo, self.hi, out=u_new)
+
+        if trip is None:
+            self.u = u_new
+            self.e_prev2 = self.e_prev
+            self.e_prev = e.copy()
+            return self.u
+
+        trip = np.broadcast_to(trip, self.shape)
+        self.u = np.where(trip, self.u if trip_value is None else trip_value, u_new)
+        self.e_prev2 = np.where(trip, self.e_prev2, self.e_prev)
+        self.e_prev = np.where(trip, self.e_prev, e)
+        return self.u
+
+    def reset(self, u_init=0.0, mask=None):
+        """
+        重置全部（或 mask 选中）回路的状态
+        """
+        mask = np.ones(self.shape, dtype=bool) if mask is None else np.broadcast_to(mask, self.shape)
+        self.e_prev = np.where(mask, 0.0, self.e_prev)
+        self.e_prev2 = np.where(mask, 0.0, self.e_prev2)
+        self.u = np.where(mask, u_init, self.u)
@@ -14,6 +14,9 @@ def update_hydraulics(
 ):
     """
     熔盐堆流体系统的一维瞬态流体动力学更新（半隐式格式）
+
+    pump_head: 泵提供的压升 (Pa)，沿流道长度 (N-1)·dx 均布为动量方程源项；
+               置 0 即泵跳闸，流动只受压差、重力与摩擦驱动
     """
 
     N = len(rho)
@@ -21,6 +24,7 @@ def update_hydraulics(
     u_new = u.copy()
     p_new = p.copy()
     H_new = H.copy()
+    pump_source = pump_head / ((N - 1) * dx)   # 单位体积动量源 (Pa/m)
 
     for i in range(1, N-1):
         # 主控制体参数
@@ -45,6 +49,7 @@ def update_hydraulics(
             - (rho[i]*u[i]**2 + p[i] - rho[i-1]*u[i-1]**2 - p[i-1]) / dx
             - rho[i] * g * sin_theta
             - friction * u[i]
+            + pump_source
         ) / rho[i]
         u_new[i] += du_dt * dt
 
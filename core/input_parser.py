@@ -1,10 +1,19 @@
 # core/input_parser.py
 
 import os
-import yaml
 import json
+import pickle
+import hashlib
 
-def load_input_card(filepath: str) -> dict:
+# 缓存格式版本：校验规则或缓存内容变化时递增，使旧缓存失效
+CACHE_VERSION = 1
+REQUIRED_SECTIONS = [
+    "neutronics", "thermal_1d", "thermal_2d",
+    "hydraulics", "control", "recorder", "visualization"
+]
+
+
+def load_input_card(filepath: str, cache_dir=None) -> dict:
     """
     读取输入卡（YAML 或 JSON），返回完整配置字典，分模块提取子参数。
 
@@ -72,23 +81,58 @@ def load_input_card(filepath: str) -> dict:
         "recorder": { ... },
         "visualization": { ... }
       }
+
+    缓存：
+      解析并通过校验的配置以 pickle 形式缓存于 cache_dir（缺省为输入卡同目录下的 .card_cache），
+      以文件内容的 SHA-256 为键；输入卡未改动时直接读取缓存，跳过 YAML 解析与 yaml 模块导入。
+      每次调用返回独立的新字典。cache_dir=False 关闭缓存
     """
+    with open(filepath, 'rb') as f:
+        raw = f.read()
+
+    cache_path = None
+    if cache_dir is not False:
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(filepath)), ".card_cache")
+        digest = hashlib.sha256(raw).hexdigest()
+        name = os.path.splitext(os.path.basename(filepath))[0]
+        cache_path = os.path.join(cache_dir, f"{name}-v{CACHE_VERSION}-{digest[:32]}.pkl")
+        try:
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass
+
+    cfg = parse_input_card(raw, filepath)
 
+    if cache_path is not None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                pickle.dump(cfg, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass  # 缓存目录不可写时只是失去加速
+    return cfg
+
+
+def parse_input_card(raw: bytes, filepath: str) -> dict:
+    """
+    解析输入卡原始内容并校验必需段落（不经缓存）
+    """
     ext = os.path.splitext(filepath)[1].lower()
-    with open(filepath, 'r', encoding='utf-8') as f:
-        if ext in ('.yaml', '.yml'):
-            cfg = yaml.safe_load(f)
-        elif ext == '.json':
-            cfg = json.load(f)
-        else:
-            raise ValueError(f"Unsupported config format: {ext}")
+    text = raw.decode('utf-8')
+    if ext in ('.yaml', '.yml'):
+        import yaml
+        cfg = yaml.safe_load(text)
+    elif ext == '.json':
+        cfg = json.loads(text)
+    else:
+        raise ValueError(f"Unsupported config format: {ext}")
 
     # 简单验证
-    required_sections = [
-        "neutronics", "thermal_1d", "thermal_2d",
-        "hydraulics", "control", "recorder", "visualization"
-    ]
-    missing = [sec for sec in required_sections if sec not in cfg]
+    missing = [sec for sec in REQUIRED_SECTIONS if sec not in cfg]
     if missing:
         raise KeyError(f"Input card missing sections: {missing}")
     
@@ -1,11 +1,212 @@
 """
 IOInterface 模块 — 与外部系统进行数据交换的接口
 支持文件读取、写入、Socket 通信等拓展方式
+
+Socket 帧格式（网络字节序）：
+    u32 帧长度 + u8 帧类型 + 帧内容
+    'H' 握手帧：JSON {"channels": [...]}，每次建立连接后首先发送
+    'D' 数据帧：u32 序号 + f64 时刻 + 各通道 f64 值（按握手帧中的通道顺序）
+    'T' 文本帧：UTF-8 文本（send_to_socket 兼容接口）
 """
 
+import os
 import json
-import pandas as pd
-import socket
+import math
+import time
+import struct
+import threading
+from collections import deque
+
+FRAME_HEADER = struct.Struct("!IB")
+DATA_HEADER = struct.Struct("!Id")
+
+
+class SocketPublisher:
+    """
+    持久化、非阻塞的 Socket 状态发布器
+
+    - publish() 只打包并放入有界发送队列，立即返回，仿真主循环不等待网络
+    - 队列满时丢弃最旧帧（drop-oldest），保证外部看到的是最新状态
+    - 后台发送线程维持长连接，断线后按 reconnect_interval 自动重连
+    """
+
+    def __init__(self, host="127.0.0.1", port=9999, channels=(), maxsize=1024,
+                 reconnect_interval=1.0, timeout=2.0):
+        self.host = host
+        self.port = port
+        self.channels = list(channels)
+        self.reconnect_interval = reconnect_interval
+        self.timeout = timeout
+        self._data_struct = struct.Struct("!" + "d" * len(self.channels))
+
+        self._queue = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._sock = None
+        self._seq = 0
+
+        self.sent = 0
+        self.dropped = 0
+        self.reconnects = 0
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="SocketPublisher", daemon=True)
+        self._thread.start()
+        return self
+
+    def publish(self, state, t=0.0):
+        """
+        发布一帧状态：state 为 {通道名: 数值}，缺失通道记为 NaN
+        """
+        values = [float(state.get(key, float('nan'))) for key in self.channels]
+        body = DATA_HEADER.pack(self._seq & 0xFFFFFFFF, float(t)) + self._data_struct.pack(*values)
+        self._seq += 1
+        self._enqueue(self._frame(b'D', body))
+
+    def publish_text(self, text):
+        self._enqueue(self._frame(b'T', text.encode('utf-8')))
+
+    def stop(self, timeout=2.0):
+        """
+        停止发送线程（尽量发送完队列中剩余帧后关闭连接）
+        """
+        if not self._running:
+            return
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout)
+        self._close_socket()
+
+    @staticmethod
+    def _frame(kind, body):
+        return FRAME_HEADER.pack(len(body) + 1, kind[0]) + body
+
+    def _enqueue(self, frame):
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(frame)
+            self._cond.notify()
+
+    def _connect(self):
+        import socket
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        hello = json.dumps({"channels": self.channels}).encode('utf-8')
+        sock.sendall(self._frame(b'H', hello))
+        self._sock = sock
+
+    def _close_socket(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                batch = list(self._queue)
+                self._queue.clear()
+
+            while True:
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    self._sock.sendall(b''.join(batch))
+                    self.sent += len(batch)
+                    break
+                except OSError:
+                    self._close_socket()
+                    if not self._running:
+                        return
+                    self.reconnects += 1
+                    time.sleep(self.reconnect_interval)
+                    # 重连期间积压的新帧优先：旧批次中超出队列容量的部分丢弃
+                    with self._cond:
+                        room = self._queue.maxlen - len(self._queue)
+                        self.dropped += max(0, len(batch) - room)
+                        batch = batch[max(0, len(batch) - room):] if room > 0 else []
+                        batch += list(self._queue)
+                        self._queue.clear()
+                    if not batch:
+                        break
+
+
+class SetpointWatcher:
+    """
+    外部设定值文件（如 GUI 写入的 external_input.json）热加载器
+
+    poll() 每步可调用：按 poll_interval 秒节流检查文件 mtime/size，
+    仅在文件变化时重新解析，其余调用只有一次时间比较
+    只接受 keys 中列出的字段；文件写到一半解析失败时保留旧值，下次再试；
+    字段不是有限数值（如 "abc"、null）时整个文件被拒绝，保留旧值直到文件再次修改
+
+    apply_existing=False 时，创建时已存在的文件（如上一次 GUI 会话遗留）不生效，
+    只有运行期间被修改后才覆盖输入卡中的设定值
+    """
+
+    def __init__(self, path, keys=("T_ref", "n_ref"), poll_interval=0.5, apply_existing=False):
+        self.path = path
+        self.keys = tuple(keys)
+        self.poll_interval = poll_interval
+        self.values = {}
+        self._signature = None if apply_existing else self._stat()
+        self._next_check = 0.0
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def poll(self, now=None):
+        """
+        返回新的设定值字典（文件变化且解析成功时），否则返回 None
+        """
+        now = time.monotonic() if now is None else now
+        if now < self._next_check:
+            return None
+        self._next_check = now + self.poll_interval
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._signature = signature
+        try:
+            values = {key: self._number(data[key]) for key in self.keys if key in data}
+        except (TypeError, ValueError) as e:
+            print(f"[SetpointWatcher] 忽略无效设定值文件 {self.path}: {e}")
+            return None
+        if values == self.values:
+            return None
+        self.values = values
+        return dict(values)
+
+    @staticmethod
+    def _number(value):
+        if isinstance(value, bool):
+            raise TypeError(f"expected a number, got {value!r}")
+        value = float(value)
+        if not math.isfinite(value):
+            raise ValueError(f"expected a finite number, got {value!r}")
+        return value
+
 
 class IOInterface:
     """
@@ -16,15 +217,22 @@ class IOInterface:
     def __init__(self, input_path=None, output_path=None):
         self.input_path = input_path
         self.output_path = output_path
+        self.publishers = {}
+        self._input_cache = (None, {})
 
     def read_input_json(self):
-        """从 JSON 文件读取控制输入或设定参数"""
+        """从 JSON 文件读取控制输入或设定参数（文件未变化时返回缓存结果）"""
         if not self.input_path:
             return {}
         try:
+            st = os.stat(self.input_path)
+            signature = (st.st_mtime_ns, st.st_size)
+            if signature == self._input_cache[0]:
+                return dict(self._input_cache[1])
             with open(self.input_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            return data
+            self._input_cache = (signature, data)
+            return dict(data)
         except Exception as e:
             print(f"[IOInterface] 读取失败: {e}")
             return {}
@@ -32,18 +240,35 @@ class IOInterface:
     def write_output_csv(self, data_dict, filename="external_output.csv"):
         """将仿真结果写入 CSV 文件"""
         try:
+            import pandas as pd
             df = pd.DataFrame(data_dict)
             df.to_csv(filename, index=False)
             print(f"[IOInterface] 已写入输出结果: {filename}")
         except Exception as e:
             print(f"[IOInterface] 写入失败: {e}")
 
+    def watch_setpoints(self, path=None, **kwargs):
+        """创建外部设定值热加载器（默认监视 input_path）"""
+        return SetpointWatcher(path or self.input_path, **kwargs)
+
+    def start_publisher(self, host="127.0.0.1", port=9999, channels=(), **kwargs):
+        """启动（或复用）到 host:port 的持久化状态发布器"""
+        key = (host, port)
+        if key not in self.publishers:
+            self.publishers[key] = SocketPublisher(host, port, channels, **kwargs).start()
+        return self.publishers[key]
+
+    def publish(self, state, t=0.0):
+        """向所有已启动的发布器发布一帧状态（非阻塞）"""
+        for pub in self.publishers.values():
+            pub.publish(state, t)
+
     def send_to_socket(self, ip="127.0.0.1", port=9999, payload="status OK"):
-        """向远程 Socket 发送仿真状态（可用于嵌入式或实时系统）"""
-        try:
-            s = socket.socket()
-            s.connect((ip, port))
-            s.send(payload.encode('utf-8'))
-            s.close()
-        except Exception as e:
-            print(f"[IOInterface] Socket发送失败: {e}")
+        """向远程 Socket 发送仿真状态（可用于嵌入式或实时系统），复用持久连接，非阻塞"""
+        self.start_publisher(ip, port).publish_text(payload)
+
+    def close(self):
+        """停止所有发布器"""
+        for pub in self.publishers.values():
+            pub.stop()
+        self.publishers.clear()
@@ -0,0 +1,146 @@
+"""
+Scenario 模块 — 预编译的瞬态工况时间表（反应性引入、泵扬程、边界温度、设定值阶跃）
+
+输入卡示例：
+--------------------------------------------------
+scenario:
+  channels:
+    rho_insertion:                 # 外加反应性，与控制反应性叠加
+      profile: [[0, 0.0], [100, 0.0], [110, 1.0e-3]]   # 分段线性
+    bc_T_inf:                      # thermal_1d Robin 边界流体温度
+      steps: [[0, 600], [500, 580]]                    # 阶跃（零阶保持）
+    pump_head:
+      table: scenarios/pump_coastdown.csv              # 表格文件：t, value 两列，分段线性
+  events:                          # 时间戳事件，按阶跃并入对应通道
+    - {t: 200, T_ref: 970}
+    - {t: 600, pump_head: 0.0}     # 泵跳闸
+--------------------------------------------------
+也可写作 scenario: {file: scenarios/xxx.yaml} 引用独立的工况库文件
+仅由 events 定义的通道在首个事件之前不输出，仿真沿用输入卡中的原值（设定值、泵扬程、边界温度）
+
+加载时所有通道编译为按时间排序的数组；仿真中时间单调推进，
+每步查询只是游标前移（均摊 O(1)），不调用任何 Python 回调
+"""
+
+import os
+
+import numpy as np
+
+CHANNELS = ("rho_insertion", "pump_head", "bc_T_inf", "T_ref", "n_ref")
+
+
+class ScenarioChannel:
+    """
+    单个已编译通道：times 升序，kind 为 'linear'（分段线性）或 'step'（零阶保持）
+    早于首点取首值，晚于末点取末值；start 之前通道不生效（Scenario.sample 不输出该通道）
+    """
+
+    def __init__(self, name, times, values, kind='linear', start=-np.inf):
+        times = np.asarray(times, dtype=float)
+        values = np.asarray(values, dtype=float)
+        if times.ndim != 1 or times.shape != values.shape or times.size == 0:
+            raise ValueError(f"Scenario channel '{name}' needs matching non-empty time/value columns")
+        order = np.argsort(times, kind='stable')
+        self.name = name
+        self.times = times[order]
+        self.values = values[order]
+        self.kind = kind
+        self.start = start
+        # 预计算各段斜率，查询时只做一次乘加
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = np.diff(self.values) / np.diff(self.times)
+        self.slopes = np.append(np.where(np.isfinite(slope), slope, 0.0), 0.0)
+        self._i = 0
+
+    def value(self, t):
+        times = self.times
+        i = self._i
+        if t < times[i]:
+            # 时间回退（如重复仿真）：重新定位游标
+            i = max(int(np.searchsorted(times, t, side='right')) - 1, 0)
+        n = times.size
+        while i + 1 < n and times[i + 1] <= t:
+            i += 1
+        self._i = i
+        if self.kind == 'step' or t <= times[i] or i + 1 == n:
+            return float(self.values[i])
+        return float(self.values[i] + self.slopes[i] * (t - times[i]))
+
+    def reset(self):
+        self._i = 0
+
+
+class Scenario:
+    """
+    工况时间表：由输入卡 scenario 段编译得到的若干通道
+    """
+
+    def __init__(self, channels=None):
+        self.channels = dict(channels or {})
+        self.current = {}
+
+    def __contains__(self, name):
+        return name in self.channels
+
+    @classmethod
+    def from_config(cls, cfg, base_dir="."):
+        if not cfg:
+            return cls()
+        if 'file' in cfg:
+            import yaml
+            path = os.path.join(base_dir, cfg['file'])
+            with open(path, 'r', encoding='utf-8') as f:
+                cfg = yaml.safe_load(f)
+            base_dir = os.path.dirname(path)
+            cfg = cfg.get('scenario', cfg)
+
+        tables = {}
+        for name, spec in (cfg.get('channels') or {}).items():
+            if name not in CHANNELS:
+                raise KeyError(f"Unknown scenario channel '{name}', expected one of {CHANNELS}")
+            if 'profile' in spec:
+                rows, kind = spec['profile'], 'linear'
+            elif 'steps' in spec:
+                rows, kind = spec['steps'], 'step'
+            elif 'table' in spec:
+                rows = np.loadtxt(os.path.join(base_dir, spec['table']), delimiter=',', ndmin=2,
+                                  skiprows=spec.get('skiprows', 1))
+                kind = spec.get('kind', 'linear')
+            else:
+                raise KeyError(f"Scenario channel '{name}' needs one of: profile, steps, table")
+            rows = np.asarray(rows, dtype=float).reshape(-1, 2)
+            tables[name] = [list(rows[:, 0]), list(rows[:, 1]), kind, -np.inf]
+
+        for event in cfg.get('events') or []:
+            t = float(event['t'])
+            for name, value in event.items():
+                if name == 't':
+                    continue
+                if name not in CHANNELS:
+                    raise KeyError(f"Unknown scenario event target '{name}', expected one of {CHANNELS}")
+                if name not in tables:
+                    # 无基准值的事件通道：首个事件之前不生效
+                    tables[name] = [[], [], 'step', None]
+                elif tables[name][2] != 'step':
+                    raise ValueError(f"Scenario channel '{name}' mixes a {tables[name][2]} profile with events")
+                tables[name][0].append(t)
+                tables[name][1].append(float(value))
+
+        return cls({name: ScenarioChannel(name, t, v, kind, min(t) if start is None else start)
+                    for name, (t, v, kind, start) in tables.items()})
+
+    def sample(self, t):
+        """
+        返回 t 时刻各生效通道的值（复用同一字典，避免每步分配）
+        """
+        current = self.current
+        for name, ch in self.channels.items():
+            if t < ch.start:
+                current.pop(name, None)
+            else:
+                current[name] = ch.value(t)
+        return current
+
+    def reset(self):
+        for ch in self.channels.values():
+            ch.reset()
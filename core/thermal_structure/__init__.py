@@ -1,10 +1,13 @@
 from .one_d import solve_thermal_structure_1d
 from .two_d import solve_thermal_structure_2d
+from .rom import build_pod_basis, PODThermalROM
 # from .multilayer import solve_multilayer_structure
 
 __all__ = [
     "solve_thermal_structure_1d",
     "solve_thermal_structure_2d",
+    "build_pod_basis",
+    "PODThermalROM",
     # "solve_multilayer_structure"
 ]
 
@@ -0,0 +1,183 @@
+import numpy as np
+from .two_d import solve_thermal_structure_2d
+
+
+def build_pod_basis(snapshots, rank=None, energy=1.0 - 1e-12):
+    """
+    由温度场快照构造 POD 基（去均值后 SVD）
+
+    参数：
+    - snapshots: 形如 (n_snap, nz, nr) 的数组或二维场列表（如 DataRecorder.array_data['T_field']）
+    - rank: 指定基函数个数；为 None 时按能量占比 energy 截断
+    返回：
+    - mean: 平均场（展平，长度 nz·nr）
+    - basis: 正交基 Φ，形如 (nz·nr, r)
+    - sigma: 奇异值（全部）
+    """
+    X = np.asarray([np.asarray(s, dtype=float).ravel() for s in snapshots])
+    mean = X.mean(axis=0)
+    _, sigma, Vt = np.linalg.svd(X - mean, full_matrices=False)
+    if rank is None:
+        cum = np.cumsum(sigma ** 2)
+        rank = int(np.searchsorted(cum, energy * cum[-1]) + 1) if cum[-1] > 0 else 1
+    rank = max(1, min(rank, Vt.shape[0]))
+    return mean, Vt[:rank].T, sigma
+
+
+class PODThermalROM:
+    """
+    二维热构件 POD 降阶模型（Galerkin 投影 ADI 算子）
+
+    对固定的物性、网格与边界条件，solve_thermal_structure_2d 的一步推进是仿射映射
+        T_new = A T + B q + c
+    取 T ≈ T_mean + Φ a、q = amp · q_shape，投影得到 r 维稠密系统
+        a_new = Ar a + cr + amp · br
+    算子通过对基函数调用 r + 3 次完整求解器构造（只在建模时计算一次）。
+
+    误差估计：每步计算全阶一步映射中落在子空间之外的残差（均方根，K）
+        ‖(I - ΦΦᵀ)(A T_rom + B q + c - T_mean)‖ / √N
+    其 Gram 矩阵预先算好，每步开销 O(r²)。误差指标按降阶算子的收缩性传播：在 Ar 的特征坐标
+    Ar = V Λ V⁻¹ 下一步映射的范数为谱半径 ρ(Ar)，故
+        e ← ρ(Ar) · e + ‖V⁻¹‖₂ · res,   err_est = ‖V‖₂ · e
+    历史误差随算子衰减而不是无限累加（Ar 亏损或 V 病态时退化为 ρ = ‖Ar‖₂、V = I）。
+    ADI 算子非正规，子空间外分量不受 Ar 约束，故 err_est 并非严格上界，但实测高于真实均方根误差；
+    超过 tol（K）时由当前重构场切换到完整求解器。
+    完整求解器模式下每 reproject_every 步将全阶场重新投影，投影残差低于 reentry_tol
+    （缺省 tol/2，留出回差避免在阈值附近反复切换）时以该残差为新的误差基准返回降阶模式
+    """
+
+    def __init__(self, mean, basis, solver_kwargs, shape, q_shape=None, tol=1.0,
+                 reproject_every=10, reentry_tol=None):
+        self.mean = np.asarray(mean, dtype=float).ravel()
+        self.basis = np.asarray(basis, dtype=float)
+        self.shape = tuple(shape)
+        self.solver_kwargs = dict(solver_kwargs)
+        self.q_shape = np.zeros(self.shape) if q_shape is None else np.asarray(q_shape, dtype=float)
+        self.tol = tol
+        self.reproject_every = max(1, int(reproject_every))
+        self.reentry_tol = 0.5 * tol if reentry_tol is None else reentry_tol
+
+        Phi = self.basis
+        zero = np.zeros(self.shape)
+        c = self._full(zero, 0.0).ravel()
+        A_Phi = np.column_stack([self._full(phi.reshape(self.shape), 0.0).ravel() - c for phi in Phi.T])
+        d = self._full(self.mean.reshape(self.shape), 0.0).ravel() - self.mean   # A T_mean + c - T_mean
+        b = self._full(zero, 1.0).ravel() - c                                   # B q_shape
+
+        self.Ar = Phi.T @ A_Phi
+        self.cr = Phi.T @ d
+        self.br = Phi.T @ b
+
+        # 子空间外残差：R [a; 1; amp]，预存 RᵀR
+        M = np.column_stack([A_Phi, d, b])
+        R = M - Phi @ (Phi.T @ M)
+        self.residual_gram = R.T @ R / R.shape[0]
+        self.contraction, self._v_norm, self._v_inv_norm = self._contraction(self.Ar)
+
+        self.a = np.zeros(Phi.shape[1])
+        self.T_full = None        # 完整求解器模式下的全阶状态
+        self.err_est = 0.0
+        self._err_modal = 0.0     # 特征坐标下的误差指标，err_est = ‖V‖ · _err_modal
+        self.rom_steps = 0
+        self.full_steps = 0
+        self.fallbacks = 0
+        self.reentries = 0
+        self._full_run = 0        # 本次进入完整求解器模式后的步数
+
+    @classmethod
+    def from_snapshots(cls, snapshots, solver_kwargs, rank=None, energy=1.0 - 1e-12, **kwargs):
+        snapshots = [np.asarray(s, dtype=float) for s in snapshots]
+        mean, basis, _ = build_pod_basis(snapshots, rank=rank, energy=energy)
+        return cls(mean, basis, solver_kwargs, snapshots[0].shape, **kwargs)
+
+    @classmethod
+    def from_recorder(cls, recorder, solver_kwargs, key="T_field", **kwargs):
+        """由 DataRecorder 记录的温度场快照（默认 T_field）构造降阶模型"""
+        _, snapshots = recorder.get_series(key)
+        if not snapshots:
+            raise ValueError(f"DataRecorder has no snapshots for '{key}'")
+        return cls.from_snapshots(snapshots, solver_kwargs, **kwargs)
+
+    @property
+    def rank(self):
+        return self.basis.shape[1]
+
+    @property
+    def using_full(self):
+        return self.T_full is not None
+
+    @staticmethod
+    def _contraction(Ar, max_cond=1e6):
+        """返回 (单步收缩因子, ‖V‖₂, ‖V⁻¹‖₂)"""
+        try:
+            w, V = np.linalg.eig(Ar)
+            V_inv = np.linalg.inv(V)
+            if np.linalg.cond(V) < max_cond:
+                return float(np.abs(w).max()), float(np.linalg.norm(V, 2)), float(np.linalg.norm(V_inv, 2))
+        except np.linalg.LinAlgError:
+            pass
+        return float(np.linalg.norm(Ar, 2)), 1.0, 1.0
+
+    def _full(self, T, amp):
+        return solve_thermal_structure_2d(T, q=amp * self.q_shape, **self.solver_kwargs)
+
+    @staticmethod
+    def _rms(x):
+        return float(np.sqrt(np.mean(x ** 2)))
+
+    def project(self, T):
+        return self.basis.T @ (np.asarray(T, dtype=float).ravel() - self.mean)
+
+    def reconstruct(self, a=None):
+        a = self.a if a is None else a
+        return (self.mean + self.basis @ a).reshape(self.shape)
+
+    @property
+    def field(self):
+        """当前温度场（降阶模式下由基重构）"""
+        return self.T_full.copy() if self.T_full is not None else self.reconstruct()
+
+    def _anchor(self, T):
+        """投影全阶场，以投影残差作为新的误差基准，返回该残差"""
+        self.a = self.project(T)
+        self.err_est = self._rms(T.ravel() - self.reconstruct().ravel())
+        self._err_modal = self._v_inv_norm * self.err_est
+        return self.err_est
+
+    def set_state(self, T):
+        """以给定温度场作为初值：投影残差计入误差估计"""
+        T = np.asarray(T, dtype=float)
+        self.T_full = None
+        self._full_run = 0
+        if self._anchor(T) > self.tol:
+            self.T_full = T.copy()
+
+    def step(self, amp=1.0):
+        """
+        推进一步（热源 q = amp · q_shape），返回当前是否处于降阶模式
+        """
+        if self.T_full is not None:
+            self.T_full = self._full(self.T_full, amp)
+            self.full_steps += 1
+            self._full_run += 1
+            if self._full_run % self.reproject_every == 0 and self._anchor(self.T_full) < self.reentry_tol:
+                # 全阶场重新落回子空间附近：返回降阶模式
+                self.T_full = None
+                self.reentries += 1
+            return False
+
+        v = np.append(self.a, (1.0, amp))
+        res = float(np.sqrt(max(v @ self.residual_gram @ v, 0.0)))
+        err_modal = self.contraction * self._err_modal + self._v_inv_norm * res
+        if self._v_norm * err_modal > self.tol:
+            # 降阶模型漂移：由当前重构场切换到完整求解器
+            self.fallbacks += 1
+            self.T_full = self.reconstruct()
+            self._full_run = 0
+            return self.step(amp)
+
+        self.a = self.Ar @ self.a + self.cr + amp * self.br
+        self._err_modal = err_modal
+        self.err_est = self._v_norm * err_modal
+        self.rom_steps += 1
+        return True
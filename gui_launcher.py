@@ -1,6 +1,11 @@
 import streamlit as st
 import pandas as pd
 import json
+import os
+import time
+
+from utils.results_store import ResultsReader
+from utils.visualization.output import tail_csv, minmax_decimate
 
 st.title("☢ MSREⅡ 控制面板")
 
@@ -10,16 +15,125 @@ n_ref = st.sidebar.slider("目标中子功率 n_ref", 0.0, 2.0, 1.0)
 
 if st.sidebar.button("提交控制参数"):
     params = {"T_ref": T_ref, "n_ref": n_ref}
-    with open("external_input.json", "w", encoding="utf-8") as f:
+    # 先写临时文件再原子替换，仿真侧热加载不会读到半个文件
+    with open("external_input.json.tmp", "w", encoding="utf-8") as f:
         json.dump(params, f, indent=2)
+    os.replace("external_input.json.tmp", "external_input.json")
     st.sidebar.success("控制参数已更新 ✅")
 
 st.subheader("温度与功率演化结果")
+
+RESULTS_FILE = "outputs/run1/results.msrb"
+LOG_FILE = "outputs/run1/data_log.csv"
+KEYS = ["T_out", "n"]
+
+follow = st.sidebar.checkbox("跟随运行中的仿真", value=True)
+refresh_s = st.sidebar.number_input("刷新间隔 (s)", 0.5, 30.0, 2.0)
+max_points = st.sidebar.number_input("显示点数上限", 200, 20000, 2000, step=200)
+
+
+def _source():
+    """优先读取二进制结果容器，其次读取日志器实时追加的 data_log.csv"""
+    for path in (RESULTS_FILE, LOG_FILE):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _new_cache(path, stat):
+    return {"path": path, "inode": stat.st_ino, "size": 0, "fingerprint": b"", "offset": 0, "columns": None,
+            "last_t": None, "reader": None, "df": pd.DataFrame(columns=KEYS)}
+
+
+def _fingerprint(path, size, n=256):
+    """已读取部分的首尾各 n 字节：两个写入端都只追加，内容变化说明文件被重写"""
+    with open(path, 'rb') as f:
+        head = f.read(min(n, size))
+        f.seek(max(0, size - n))
+        return head + f.read(min(n, size))
+
+
+def _rewritten(cache, stat):
+    """
+    文件是否已被新一次运行改写：两个写入端都原地截断重写（inode 不变），
+    因此以文件变小或已读部分的内容变化作为判据
+    """
+    if cache["inode"] != stat.st_ino or stat.st_size < cache["size"]:
+        return True
+    return _fingerprint(cache["path"], cache["size"]) != cache["fingerprint"]
+
+
+def _read_new(cache):
+    """
+    读取缓存位置之后新增的数据；发现时间回退或块标记错位（新运行的内容）时返回 None
+    """
+    path, last_t = cache["path"], cache["last_t"]
+    if path == RESULTS_FILE:
+        reader = cache["reader"]
+        if reader is None:
+            reader = cache["reader"] = ResultsReader(path)
+        else:
+            count = reader.refresh()
+            if count == 0:
+                return pd.DataFrame(columns=KEYS)
+            t0 = reader.chunks[-count][1]["t0"]
+            if last_t is not None and t0 is not None and t0 < last_t:
+                return None
+        data = reader.load(KEYS, t0=last_t)
+        new = pd.DataFrame({key: pd.Series(ch.values, index=ch.t) for key, ch in data.items()})
+        return new[new.index > last_t] if last_t is not None else new
+
+    rows, cache["offset"], cache["columns"] = tail_csv(path, cache["offset"], cache["columns"])
+    new = rows.rename(columns={"Time(s)": "time", "T_out(K)": "T_out"}).set_index("time")[KEYS]
+    # 正常追加时新行时刻必然晚于已读数据；否则是从旧偏移处读到了新运行的文件
+    if last_t is not None and len(new) and not new.index[0] > last_t:
+        return None
+    return new
+
+
+def _update_frame():
+    """
+    增量更新缓存的结果表：只读取上次位置之后新增的数据
+    缓存保存在 st.session_state 中，Streamlit 每次重跑不再重新解析整个文件；
+    检测到结果文件被新一次运行重写时丢弃缓存，从头读取
+    """
+    path = _source()
+    if path is None:
+        return None
+    for _ in range(2):
+        stat = os.stat(path)
+        cache = st.session_state.get("live")
+        if cache is None or cache["path"] != path or _rewritten(cache, stat):
+            cache = st.session_state["live"] = _new_cache(path, stat)
+        try:
+            new = _read_new(cache)
+        except (ValueError, TypeError):
+            new = None
+        if new is None:
+            st.session_state["live"] = None
+            continue
+        cache["size"], cache["fingerprint"] = stat.st_size, _fingerprint(path, stat.st_size)
+        if len(new):
+            new.index.name = "time"
+            cache["df"] = pd.concat([cache["df"], new]) if len(cache["df"]) else new
+            cache["last_t"] = float(new.index[-1])
+        return cache["df"]
+    return None
+
+
 try:
-    df = pd.read_csv("outputs/run1/scalars.csv")
-    st.line_chart(df.set_index("time")[["T_out", "n"]])
-except Exception:
-    st.info("尚未生成仿真结果数据，请先运行仿真程序")
+    df = _update_frame()
+    if df is None or df.empty:
+        st.info("尚未生成仿真结果数据，请先运行仿真程序")
+    else:
+        st.caption(f"已读取 {len(df)} 个时间点，最新时刻 t = {df.index[-1]:.1f} s")
+        st.line_chart(minmax_decimate(df, int(max_points)))
+except Exception as e:
+    st.info(f"结果数据暂不可读：{e}")
 
 st.markdown("---")
 st.caption("© MSREⅡ 仿真平台 by 鸿强")
+
+if follow:
+    time.sleep(refresh_s)
+    st.rerun()
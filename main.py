@@ -3,21 +3,38 @@ from core.input_parser import load_input_card
 from core.neutronics import PointKineticsWithDecay
 from core.thermal_structure.one_d import solve_thermal_structure_1d
 from core.hydraulics import update_hydraulics
+from core.io_interface import IOInterface
+from core.scenario import Scenario
 from controllers.manager import ControlManager
 from utils.data_recorder import DataRecorder
 from utils.logger import SimulationLogger
+from utils.timing import StageTimer, Pacer
 
 import numpy as np
 import os
 
-def main():
-    # === 1. 读取配置文件 ===
-    params = load_input_card("input_card.yaml")
+
+def run_simulation(params, recorder=None, logger=None, io=None, setpoint_watcher=None, should_abort=None,
+                   pacer=None, timer=None):
+    """
+    时间推进主循环（不含文件输出），可被 main() 与批量/调参工具复用
+
+    参数：
+    - params: load_input_card() 返回的配置字典
+    - recorder / logger / io / setpoint_watcher: 可选的记录、日志、外部接口模块
+    - should_abort(step, t, T_out, n): 可选回调，返回 True 时提前终止（如调参时淘汰明显不良的候选）
+    - pacer: 可选 Pacer，按墙钟节拍推进（每步计算完成后等待至截止时刻）
+    - timer: 可选 StageTimer，缺省时内部创建；统计控制/中子动力学/热工/水力/输出各阶段最坏耗时
+
+    返回：
+    - {"ctrl": ControlManager, "t": ndarray, "T_out": ndarray, "n": ndarray, "aborted": bool,
+       "timer": StageTimer}
+      时间序列只包含实际推进的步数
+    """
     neutronics_cfg    = params['neutronics']
     thermal1d_cfg     = params['thermal_1d']
     hydraulics_cfg    = params['hydraulics']
     control_cfg       = params['control']
-    recorder_cfg      = params['recorder']
 
     dt = hydraulics_cfg['dt']
     steps = int(params['meta']['t_end'] / dt)
@@ -38,27 +55,85 @@ def main():
     p = np.ones(N) * hydraulics_cfg.get('p0', 1e5)
     H = np.ones(N) * hydraulics_cfg.get('H0', 2e5)
 
-    ctrl = ControlManager(dt=dt)
-    recorder = DataRecorder(recorder_cfg['output_dir'])
-    logger = SimulationLogger(recorder_cfg['output_dir'])
+    # MPC 预测模型的单群等效动力学参数取自中子学输入
+    beta_i = np.asarray(neutronics_cfg['beta_i'], dtype=float)
+    lambda_i = np.asarray(neutronics_cfg['lambda_i'], dtype=float)
+    mpc_cfg = control_cfg.setdefault('mpc', {})
+    mpc_cfg.setdefault('beta', float(beta_i.sum()))
+    mpc_cfg.setdefault('lambda_eff', float(beta_i.sum() / np.sum(beta_i / lambda_i)))
+    mpc_cfg.setdefault('Lambda', float(neutronics_cfg['Lambda']))
+
+    ctrl = ControlManager(dt=dt, T_ref=control_cfg.get('T_ref', 950), n_ref=control_cfg.get('n_ref', 1.0),
+                          cfg=control_cfg)
+
+    # 水力学模块只接收其函数签名内的参数
+    hydraulics_kw = {key: hydraulics_cfg[key] for key in ('sin_theta', 'g', 'A', 'Av', 'friction', 'pump_head')
+                     if key in hydraulics_cfg}
+
+    # 工况时间表（反应性引入、泵扬程、Robin 边界温度、设定值），加载时预编译
+    scenario = Scenario.from_config(params.get('scenario'))
+    bc_value = list(thermal1d_cfg['bc_value'])
+    robin_sides = [i for i, kind in enumerate(thermal1d_cfg['bc_type']) if kind == 'Robin']
+
+    t_hist = np.zeros(steps)
+    T_out_hist = np.zeros(steps)
+    n_hist = np.zeros(steps)
+    aborted = False
+    if timer is None:
+        timer = StageTimer()
+    if pacer is not None:
+        pacer.start()
 
     # === 3. 开始时间推进循环 ===
+    prev_scram, prev_mode = False, ctrl.control_mode
     for step in range(steps):
         t = step * dt
+        timer.start(step)
+        if recorder is not None:
+            recorder.advance(step, t)
 
-        # 控制器输入
+        # 外部设定值热加载（文件未变化时几乎无开销）
+        if setpoint_watcher is not None:
+            new_setpoints = setpoint_watcher.poll()
+            if new_setpoints:
+                ctrl.apply_setpoints(new_setpoints, step)
+                if logger is not None:
+                    logger.log_event(f"Setpoints updated at step {step}: {new_setpoints}")
+        # 记录器落盘与设定值文件读取属于 I/O，不计入控制耗时
+        timer.lap('io')
+
+        # 控制器输入（T_ref / n_ref 取自 ctrl.setpoints；工况表定义了对应通道时以工况表为准）
         sensors = {
             'T_out': T[-1],
-            'T_ref': params['control'].get('T_ref', 950),
             'n': pk.n,
-            'n_ref': params['control'].get('n_ref', 1.0)
         }
+        rho_ext = 0.0
+        if scenario.channels:
+            sc = scenario.sample(t)
+            if 'T_ref' in sc:
+                sensors['T_ref'] = sc['T_ref']
+            if 'n_ref' in sc:
+                sensors['n_ref'] = sc['n_ref']
+            if 'pump_head' in sc:
+                hydraulics_kw['pump_head'] = sc['pump_head']
+            if 'bc_T_inf' in sc:
+                for side in robin_sides:
+                    bc_value[side] = (bc_value[side][0], sc['bc_T_inf'])
+            rho_ext = sc.get('rho_insertion', 0.0)
         actions = ctrl.update(sensors, step)
         U = actions['U']
         rho = actions['rho']
         scram = actions['scram']
         if scram:
             rho = -0.01
+        rho += rho_ext
+        timer.lap('control')
+
+        # 事件触发：SCRAM 或控制模式切换时，记录器在事件窗口内全速记录
+        if recorder is not None and ((scram and not prev_scram) or ctrl.control_mode != prev_mode):
+            recorder.mark_event('SCRAM' if scram and not prev_scram else 'MODE_SWITCH')
+        prev_scram, prev_mode = scram, ctrl.control_mode
+        timer.lap('io')
 
         # === 中子动力学 ===
         n, C = pk.step(rho)
@@ -66,6 +141,7 @@ def main():
         # === 功率密度计算 ===
         P0 = n  # 假设归一化
         q[:] = P0 * params['meta'].get('Fp', 1.0)  # 简化功率分布
+        timer.lap('kinetics')
 
         # === 热工结构计算 ===
         T = solve_thermal_structure_1d(
@@ -73,44 +149,107 @@ def main():
             dx=dx, dt=dt,
             geometry=thermal1d_cfg['geometry'],
             bc_type=thermal1d_cfg['bc_type'],
-            bc_value=thermal1d_cfg['bc_value']
+            bc_value=bc_value
         )
+        timer.lap('thermal')
 
         # === 流体动力学计算 ===
-        rho_f, u, p, H = update_hydraulics(rho_f, u, p, H, dx=dx, dt=dt, **hydraulics_cfg)
+        rho_f, u, p, H = update_hydraulics(rho_f, u, p, H, dx=dx, dt=dt, **hydraulics_kw)
+        timer.lap('hydraulics')
+
+        t_hist[step], T_out_hist[step], n_hist[step] = t, T[-1], n
 
         # === 数据记录 ===
-        recorder.record_scalar("time", t)
-        recorder.record_scalar("n", n)
-        recorder.record_scalar("T_out", T[-1])
-        recorder.record_scalar("rho", rho)
-        recorder.record_scalar("U", U)
-        recorder.record_scalar("scram", scram)
-        recorder.record_array("T_core", T)
+        if recorder is not None:
+            recorder.record_scalar("time", t)
+            recorder.record_scalar("n", n)
+            recorder.record_scalar("T_out", T[-1])
+            recorder.record_scalar("rho", rho)
+            recorder.record_scalar("U", U)
+            recorder.record_scalar("scram", scram)
+            recorder.record_array("T_core", T)
 
-        logger.log_data(step, t, T[-1], n, rho, U, scram)
+        if logger is not None:
+            logger.log_data(step, t, T[-1], n, rho, U, scram)
+        if io is not None and io.publishers:
+            io.publish({'n': n, 'T_out': T[-1], 'rho': rho, 'U': U, 'scram': scram}, t)
+        timer.lap('io')
+        timer.stop()
+
+        if should_abort is not None and should_abort(step, t, T[-1], n):
+            aborted = True
+            steps = step + 1
+            break
+        if pacer is not None:
+            pacer.wait(step)
+
+    return {"ctrl": ctrl, "t": t_hist[:steps], "T_out": T_out_hist[:steps], "n": n_hist[:steps],
+            "aborted": aborted, "timer": timer}
+
+
+def main():
+    # === 1. 读取配置文件 ===
+    params = load_input_card("input_card.yaml")
+    recorder_cfg      = params['recorder']
+    dt = params['hydraulics']['dt']
+
+    recorder = DataRecorder(recorder_cfg['output_dir'], policies=recorder_cfg.get('policies'),
+                            store=recorder_cfg.get('store'), chunk_steps=recorder_cfg.get('store_chunk_steps', 256))
+    logger = SimulationLogger(recorder_cfg['output_dir'], flush_interval=recorder_cfg.get('log_flush_interval', 1.0))
+
+    # 外部状态发布（可选）：持久连接、非阻塞
+    io = IOInterface(input_path=params.get('io', {}).get('setpoint_file', 'external_input.json'))
+    setpoint_watcher = io.watch_setpoints(poll_interval=params.get('io', {}).get('setpoint_poll_interval', 0.5),
+                                          apply_existing=params.get('io', {}).get('setpoint_apply_existing', False))
+    publisher_cfg = params.get('io', {}).get('publisher')
+    if publisher_cfg:
+        io.start_publisher(**publisher_cfg)
+
+    # 运行模式：asap 尽快推进；paced 按 speed_factor 锁定墙钟节拍（硬件在环、操作员培训）
+    meta_cfg = params['meta']
+    pacer = None
+    if meta_cfg.get('run_mode', 'asap') == 'paced':
+        pacer = Pacer(dt, speed_factor=meta_cfg.get('speed_factor', 1.0),
+                      spin_time=meta_cfg.get('spin_time', 0.002), capacity=int(meta_cfg['t_end'] / dt))
+
+    result = run_simulation(params, recorder=recorder, logger=logger, io=io, setpoint_watcher=setpoint_watcher,
+                            pacer=pacer)
+    ctrl = result['ctrl']
+    timing = result['timer'].report()
 
     # === 4. 输出结果 ===
     recorder.export_scalars()
     recorder.export_arrays()
+    recorder.close()
+    ctrl.export_log(os.path.join(recorder_cfg['output_dir'], "control_log.txt"), min_severity="INFO")
     logger.finalize()
+    io.close()
 
     print("✅ 模拟完成。输出数据保存在:", recorder_cfg['output_dir'])
 
+    print(f"\n⏱️ 单步最坏耗时: {timing['worst_step (ms)']:.3f} ms (step {timing['worst_step_index']})")
+    for stage, worst in timing['worst (ms)'].items():
+        print(f"  {stage}: 最坏 {worst:.3f} ms, 平均 {timing['mean (ms)'][stage]:.3f} ms")
+    if pacer is not None:
+        pacing = pacer.report()
+        budget_ok = pacing['deadline_misses'] == 0
+        print(f"  节拍 {pacer.period * 1e3:.3f} ms: 超时 {pacing['deadline_misses']} / {pacing['steps']} 步, "
+              f"最小裕量 {pacing['worst_slack (ms)']:.3f} ms {'✅' if budget_ok else '❌'}")
+
 
         # ✅ 添加在 main() 函数的最后
     from utils.evaluator import ControlEvaluator
 
-    T_ref = params['control']['T_ref']
-    t_hist = [dt * i for i in range(steps)]
-    T_out_list = recorder.scalar_data.get("T_out", [])
+    T_ref = ctrl.setpoints['T_ref']
+    T_steps, T_out_list = recorder.get_series("T_out")
+    t_hist = T_steps * dt
 
     evaluator = ControlEvaluator(t_hist, T_out_list, T_ref)
     report = evaluator.report()
 
     print("\n📈 控制器性能评估结果：")
     for key, val in report.items():
-        print(f"{key}: {val:.3f}")
+        print(f"{key}: {val:.3f}" if val is not None else f"{key}: N/A")
 # main.py
 
 
@@ -0,0 +1,192 @@
+"""
+PID 自动整定 — 以 ControlEvaluator 指标的加权目标函数搜索 Kp / Ti / Td
+
+搜索在对数增益空间进行：先拉丁超立方采样一批初始候选，之后每轮围绕当前最优点
+生成坐标方向的邻域候选（步长无改进时减半）；每批候选在进程池中并行仿真。
+候选在运行中由 OnlineControlEvaluator 流式评分；明显不良的候选（响应偏离参考值超出
+abort_band、出现非有限值，或超调项已使代价下界超过当前最优）提前终止，
+已评估的增益点缓存，重复点不再仿真。
+
+用法：
+    python -m utils.autotune --loop pid_temp --jobs 8 --t-end 300
+"""
+
+import os
+import copy
+import math
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.evaluator import OnlineControlEvaluator
+
+# 各 PID 回路对应的被控量与参考值字段
+LOOP_SIGNALS = {
+    'pid_temp': ('T_out', 'T_ref'),
+    'pid_rho': ('n', 'n_ref'),
+}
+
+DEFAULT_WEIGHTS = {
+    "Steady-State Error": 1.0,
+    "Overshoot (%)": 0.5,
+    "Settling Time (s)": 0.01,
+    "Rise Time (s)": 0.0,
+}
+
+
+def weighted_cost(report, weights, t_end):
+    """
+    由 ControlEvaluator.report() 计算加权代价；未稳定/未上升按 t_end 计
+    """
+    cost = 0.0
+    for key, w in weights.items():
+        if not w:
+            continue
+        val = report.get(key)
+        if val is None:
+            val = t_end
+        if key == "Overshoot (%)":
+            val = max(val, 0.0)
+        if not np.isfinite(val):
+            return math.inf
+        cost += w * abs(val)
+    return cost
+
+
+def _evaluate(args):
+    """
+    进程池工作函数：以给定增益运行一次仿真并返回代价
+    """
+    params, loop, gains, weights, abort_band, warmup, bound = args
+    from main import run_simulation
+
+    params = copy.deepcopy(params)
+    params['control'].setdefault(loop, {}).update(gains)
+    signal, ref_key = LOOP_SIGNALS[loop]
+    ref = params['control'].get(ref_key, 950 if ref_key == 'T_ref' else 1.0)
+    band = abort_band * abs(ref)
+    evaluator = OnlineControlEvaluator(ref)
+    w_os = weights.get("Overshoot (%)", 0.0)
+
+    def should_abort(step, t, T_out, n):
+        y = T_out if signal == 'T_out' else n
+        evaluator.update(t, y)
+        if not np.isfinite(y) or (t >= warmup and abs(y - ref) > band):
+            return True
+        # 超调只增不减，其加权值是最终代价的下界
+        return w_os * max(evaluator.overshoot(), 0.0) >= bound
+
+    result = run_simulation(params, should_abort=should_abort)
+    if result['aborted']:
+        return math.inf
+    return weighted_cost(evaluator.report(), weights, params['meta']['t_end'])
+
+
+class PIDAutoTuner:
+    """
+    基于仿真的 PID 增益自动整定器
+
+    参数：
+    - params: 输入卡配置字典（load_input_card 结果）
+    - loop: 'pid_temp' 或 'pid_rho'
+    - bounds: {"Kp": (lo, hi), "Ti": (lo, hi), "Td": (lo, hi)}，在对数空间搜索
+    - weights: ControlEvaluator 指标权重
+    - t_end: 每次评估的仿真时长（缺省沿用输入卡）
+    - abort_band: 预热 warmup 秒后响应偏离参考值超过 abort_band·|ref| 即终止该候选
+    - jobs: 并行进程数
+    """
+
+    def __init__(self, params, loop='pid_temp', bounds=None, weights=None, t_end=None,
+                 abort_band=0.5, warmup=50.0, jobs=None, seed=0):
+        self.params = copy.deepcopy(params)
+        if t_end is not None:
+            self.params['meta']['t_end'] = t_end
+        self.loop = loop
+        base = self.params['control'].get(loop, {})
+        self.names = ["Kp", "Ti", "Td"]
+        if bounds is None:
+            bounds = {k: (base.get(k, 1.0) / 10.0, base.get(k, 1.0) * 10.0) for k in self.names}
+        self.log_lo = np.log10([max(bounds[k][0], 1e-12) for k in self.names])
+        self.log_hi = np.log10([max(bounds[k][1], 1e-12) for k in self.names])
+        self.weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        self.abort_band = abort_band
+        self.warmup = warmup
+        self.jobs = jobs or os.cpu_count()
+        self.rng = np.random.default_rng(seed)
+        self.cache = {}
+        self.history = []
+
+    def _key(self, z):
+        # 对数空间 1e-3 网格上取整作为缓存键
+        return tuple(np.round(z, 3))
+
+    def _gains(self, z):
+        return {k: float(10.0 ** v) for k, v in zip(self.names, z)}
+
+    def evaluate(self, candidates, pool, bound=math.inf):
+        """
+        并行评估一批候选（对数增益向量），返回代价数组；已缓存的点直接取值
+        bound: 当前最优代价，代价下界超过该值的候选提前终止（记为 inf）
+        """
+        keys = [self._key(np.clip(z, self.log_lo, self.log_hi)) for z in candidates]
+        todo = list(dict.fromkeys(k for k in keys if k not in self.cache))
+        jobs = [(self.params, self.loop, self._gains(k), self.weights, self.abort_band, self.warmup, bound)
+                for k in todo]
+        for k, cost in zip(todo, pool.map(_evaluate, jobs)):
+            self.cache[k] = cost
+            self.history.append((self._gains(k), cost))
+        return np.array([self.cache[k] for k in keys])
+
+    def tune(self, n_init=16, max_iter=20, step=0.3, min_step=0.02):
+        """
+        执行整定，返回 (最优增益字典, 最优代价)
+        """
+        dim = len(self.names)
+        # 拉丁超立方初始采样 + 输入卡当前增益
+        strata = (self.rng.permuted(np.tile(np.arange(n_init), (dim, 1)), axis=1).T
+                  + self.rng.random((n_init, dim))) / n_init
+        init = self.log_lo + strata * (self.log_hi - self.log_lo)
+        base = self.params['control'].get(self.loop, {})
+        if all(k in base for k in self.names):
+            init = np.vstack([np.log10([base[k] for k in self.names]), init])
+
+        with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            costs = self.evaluate(init, pool)
+            best = int(np.argmin(costs))
+            z_best, c_best = init[best], costs[best]
+
+            for _ in range(max_iter):
+                if step < min_step:
+                    break
+                # 坐标方向邻域 + 随机扰动，一批并行评估
+                moves = np.vstack([np.eye(dim), -np.eye(dim), self.rng.normal(size=(dim, dim))])
+                cand = np.clip(z_best + step * moves, self.log_lo, self.log_hi)
+                costs = self.evaluate(cand, pool, bound=c_best)
+                i = int(np.argmin(costs))
+                if costs[i] < c_best:
+                    z_best, c_best = cand[i], costs[i]
+                else:
+                    step *= 0.5
+
+        return self._gains(self._key(z_best)), float(c_best)
+
+
+if __name__ == "__main__":
+    from core.input_parser import load_input_card
+
+    parser = argparse.ArgumentParser(description="PID 增益自动整定")
+    parser.add_argument("--card", default="input_card.yaml")
+    parser.add_argument("--loop", default="pid_temp", choices=sorted(LOOP_SIGNALS))
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--t-end", type=float, default=None)
+    parser.add_argument("--n-init", type=int, default=16)
+    parser.add_argument("--max-iter", type=int, default=20)
+    args = parser.parse_args()
+
+    tuner = PIDAutoTuner(load_input_card(args.card), loop=args.loop, t_end=args.t_end, jobs=args.jobs)
+    gains, cost = tuner.tune(n_init=args.n_init, max_iter=args.max_iter)
+    print(f"✅ 整定完成：{len(tuner.cache)} 个候选已评估，最优代价 = {cost:.4g}")
+    print(f"control:\n  {args.loop}:")
+    for k, v in gains.items():
+        print(f"    {k}: {v:.4g}")
@@ -1,46 +1,266 @@
 import numpy as np
-import pandas as pd
 import os
+import csv
+from collections import deque
+
+from utils.results_store import ResultsWriter
+
+
+class RecordPolicy:
+    """
+    记录策略基类：默认每步全速记录
+    offer() 返回本步需要写入的 [(step, value), ...]，可为空或包含回溯样本
+    """
+
+    def offer(self, step, value):
+        return [(step, value)]
+
+    def trigger(self, step):
+        """事件通知（如 SCRAM、控制模式切换），默认忽略"""
+        pass
+
+
+class EveryKPolicy(RecordPolicy):
+    """
+    抽稀记录：每 k 步记录一次
+    """
+
+    def __init__(self, every):
+        self.every = max(1, int(every))
+
+    def offer(self, step, value):
+        if step % self.every == 0:
+            return [(step, value)]
+        return []
+
+
+class DeadbandPolicy(RecordPolicy):
+    """
+    死区记录：仅当变量相对上次记录值变化超过 deadband 时记录
+    数组变量按最大绝对偏差判断
+    """
+
+    def __init__(self, deadband):
+        self.deadband = float(deadband)
+        self.last = None
+
+    def offer(self, step, value):
+        if self.last is not None and np.max(np.abs(value - self.last)) <= self.deadband:
+            return []
+        self.last = np.copy(value) if isinstance(value, np.ndarray) else value
+        return [(step, value)]
+
+
+class EventWindowPolicy(RecordPolicy):
+    """
+    事件窗口记录：平时按 base 策略记录，事件前 pre 步与事件后 post 步内全速记录
+    事件前的样本由环形缓冲区回溯补写
+    """
+
+    def __init__(self, base=None, pre=0, post=0):
+        self.base = base if base is not None else RecordPolicy()
+        self.pre = int(pre)
+        self.post = int(post)
+        self.full_until = -1
+        self.skipped = deque(maxlen=max(self.pre, 1))
+
+    def offer(self, step, value):
+        if step <= self.full_until:
+            return [(step, value)]
+        out = self.base.offer(step, value)
+        if not out and self.pre > 0:
+            stored = np.copy(value) if isinstance(value, np.ndarray) else value
+            self.skipped.append((step, stored))
+        return out
+
+    def trigger(self, step):
+        self.full_until = max(self.full_until, step + self.post)
+
+    def flush_pre(self, step):
+        """
+        返回事件前窗口内被跳过的样本（事件触发时调用）
+        """
+        out = [(s, v) for s, v in self.skipped if s >= step - self.pre]
+        self.skipped.clear()
+        return out
+
+
+def build_policy(spec):
+    """
+    由输入卡 recorder.policies 中的单个条目构造记录策略
+
+    支持字段：
+    - every: k            每 k 步记录
+    - deadband: x         变化超过 x 时记录
+    - event_window: [pre, post]  事件前后全速记录窗口（与上两者可组合）
+    """
+    if spec is None:
+        return RecordPolicy()
+    if 'every' in spec:
+        base = EveryKPolicy(spec['every'])
+    elif 'deadband' in spec:
+        base = DeadbandPolicy(spec['deadband'])
+    else:
+        base = RecordPolicy()
+    if 'event_window' in spec:
+        pre, post = spec['event_window']
+        return EventWindowPolicy(base, pre=pre, post=post)
+    return base
+
 
 class DataRecorder:
-    def __init__(self, output_dir="outputs"):
+    def __init__(self, output_dir="outputs", policies=None, store=None, chunk_steps=256):
         self.scalar_data = {}   # e.g., {"t": [], "n": [], "T_avg": []}
         self.array_data = {}    # e.g., {"T_p": [ndarray1, ndarray2, ...]}
+        self.scalar_steps = {}  # 各变量实际记录的步号（抽稀后与 scalar_data 对齐）
+        self.array_steps = {}
         self.output_dir = output_dir
+        self.step = 0
+        # 按变量的记录策略，未配置的变量每步记录
+        self.policies = {key: build_policy(spec) for key, spec in (policies or {}).items()}
         os.makedirs(self.output_dir, exist_ok=True)
 
+        # 二进制结果容器（可选）：每 chunk_steps 步增量写入一个数据块
+        self.store = ResultsWriter(os.path.join(self.output_dir, store)) if store else None
+        self.chunk_steps = chunk_steps
+        self._pending_time = ([], [])
+        self._pending = {}
+
+    def advance(self, step, t=None):
+        """
+        设置当前仿真步号与时刻（每步记录前调用），供抽稀与事件窗口策略及时间索引使用
+        """
+        self.step = step
+        if self.store is not None:
+            if len(self._pending_time[0]) >= self.chunk_steps:
+                self.flush()
+            self._pending_time[0].append(step)
+            self._pending_time[1].append(step if t is None else t)
+
+    def mark_event(self, name=None):
+        """
+        通知事件发生（如 SCRAM、控制模式切换）：
+        事件窗口策略回溯补写事件前样本，并在事件后全速记录
+        """
+        for key, policy in self.policies.items():
+            policy.trigger(self.step)
+            if isinstance(policy, EventWindowPolicy):
+                for s, v in policy.flush_pre(self.step):
+                    if key in self.array_steps:
+                        self._store(self.array_data, self.array_steps, key, s, v)
+                    else:
+                        self._store(self.scalar_data, self.scalar_steps, key, s, v)
+
+    def _store(self, data, steps, key, step, value):
+        if key not in data:
+            data[key] = []
+            steps[key] = []
+        data[key].append(value)
+        steps[key].append(step)
+        if self.store is not None:
+            pending = self._pending.setdefault(key, ([], []))
+            pending[0].append(step)
+            pending[1].append(value)
+
+    def flush(self):
+        """
+        将自上次写入以来的样本作为一个数据块追加到结果容器
+        """
+        if self.store is None or not self._pending_time[0]:
+            return
+        channels = {key: (s, np.stack(v) if v and isinstance(v[0], np.ndarray) else np.asarray(v, dtype=float))
+                    for key, (s, v) in self._pending.items() if s}
+        self.store.write_chunk(*self._pending_time, channels)
+        self._pending_time = ([], [])
+        self._pending = {}
+
+    def close(self):
+        """
+        写入剩余样本并关闭结果容器（仿真结束时调用）
+        """
+        if self.store is not None:
+            self.flush()
+            self.store.close()
+
     def record_scalar(self, key, value):
         """
         添加单个标量（如时刻、功率等）
         """
-        if key not in self.scalar_data:
-            self.scalar_data[key] = []
-        self.scalar_data[key].append(value)
+        policy = self.policies.get(key)
+        if policy is None:
+            self._store(self.scalar_data, self.scalar_steps, key, self.step, value)
+            return
+        for s, v in policy.offer(self.step, value):
+            self._store(self.scalar_data, self.scalar_steps, key, s, v)
 
     def record_array(self, key, array):
         """
         添加每一步的 ndarray（如温度场）
         """
-        if key not in self.array_data:
+        policy = self.policies.get(key)
+        if policy is None:
+            self._store(self.array_data, self.array_steps, key, self.step, np.copy(array))  # 防止引用冲突
+            return
+        if key not in self.array_steps:
             self.array_data[key] = []
-        self.array_data[key].append(np.copy(array))  # 防止引用冲突
+            self.array_steps[key] = []
+        for s, v in policy.offer(self.step, array):
+            self._store(self.array_data, self.array_steps, key, s, np.copy(v))
+
+    def get_series(self, key):
+        """
+        返回 (steps, values)，按步号排序（事件回溯样本可能乱序写入）
+        """
+        if key in self.scalar_data:
+            steps, values = self.scalar_steps[key], self.scalar_data[key]
+        else:
+            steps, values = self.array_steps.get(key, []), self.array_data.get(key, [])
+        order = np.argsort(steps, kind='stable')
+        return np.asarray(steps)[order], [values[i] for i in order]
 
     def export_scalars(self, filename="results/scalars.csv"):
         """
         导出时间序列变量为 CSV 文件
+        不同记录频率的变量按步号对齐，未记录处为空
         """
         filepath = os.path.join(self.output_dir, filename)
-        df = pd.DataFrame(self.scalar_data)
-        df.to_csv(filepath, index=False)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        keys = list(self.scalar_data)
+        all_steps = sorted(set().union(*(self.scalar_steps[key] for key in keys)))
+        columns = []
+        for key in keys:
+            # 与 DataFrame 一致的列类型：整数与浮点混合或有缺失时按浮点输出
+            values = np.asarray(self.scalar_data[key])
+            if values.dtype.kind in 'iu' and len(values) < len(all_steps):
+                values = values.astype(float)
+            is_float = values.dtype.kind == 'f'
+            values = values.tolist()
+            if is_float:
+                values = ["" if v != v else v for v in values]   # NaN 输出为空
+            columns.append(dict(zip(self.scalar_steps[key], values)))
+        with_index = bool(self.policies)
+        # 直接用 csv 模块写出，避免为导出加载 pandas
+        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow((["step"] if with_index else []) + keys)
+            for step in all_steps:
+                row = [col.get(step, "") for col in columns]
+                writer.writerow([step] + row if with_index else row)
 
     def export_arrays(self):
         """
         导出所有 array 数据为 .npy（可后处理）
+        配置了记录策略的变量额外导出 {key}_steps.npy
         """
-        for key, arr_list in self.array_data.items():
+        for key in self.array_data:
+            steps, arr_list = self.get_series(key)
+            if not arr_list:
+                continue
             arr_stack = np.stack(arr_list)
             filename = os.path.join(self.output_dir, f"{key}.npy")
             np.save(filename, arr_stack)
+            if key in self.policies:
+                np.save(os.path.join(self.output_dir, f"{key}_steps.npy"), steps)
 
     def reset(self):
         """
@@ -48,3 +268,7 @@ class DataRecorder:
         """
         self.scalar_data.clear()
         self.array_data.clear()
+        self.scalar_steps.clear()
+        self.array_steps.clear()
+        self._pending_time = ([], [])
+        self._pending = {}
@@ -1,14 +1,21 @@
 import numpy as np
+from collections import deque
 
 class ControlEvaluator:
-    def __init__(self, t_list, response_list, ref_value, tolerance=0.01):
-        self.t_list = np.array(t_list)
-        self.y_list = np.array(response_list)
+    """
+    控制性能评估（批量）：所有指标均为 O(n) 向量化计算
+    数值与 OnlineControlEvaluator 逐点累积的结果一致
+    """
+
+    def __init__(self, t_list, response_list, ref_value, tolerance=0.01, window=10):
+        self.t_list = np.asarray(t_list, dtype=float)
+        self.y_list = np.asarray(response_list, dtype=float)
         self.ref = ref_value
         self.tol = tolerance
+        self.window = window
 
     def steady_state_error(self):
-        last_vals = self.y_list[-10:]
+        last_vals = self.y_list[-self.window:]
         return float(np.mean(np.abs(last_vals - self.ref)))
 
     def overshoot(self):
@@ -16,16 +23,93 @@ class ControlEvaluator:
         return float((peak - self.ref) / self.ref * 100)
 
     def settling_time(self):
-        for i in range(len(self.y_list)):
-            if all(np.abs(self.y_list[i:] - self.ref) < self.tol * self.ref):
-                return float(self.t_list[i])
-        return None
+        # 最后一个超出误差带的点之后即进入并保持在误差带内
+        outside = np.flatnonzero(~(np.abs(self.y_list - self.ref) < self.tol * self.ref))
+        if outside.size == 0:
+            return float(self.t_list[0]) if self.t_list.size else None
+        last = outside[-1]
+        return float(self.t_list[last + 1]) if last + 1 < self.t_list.size else None
+
+    def rise_time(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            y_norm = (self.y_list - self.y_list[0]) / (self.ref - self.y_list[0])
+        hit_10 = np.flatnonzero(y_norm >= 0.1)
+        hit_90 = np.flatnonzero(y_norm >= 0.9)
+        if hit_10.size == 0 or hit_90.size == 0:
+            return None
+        return float(self.t_list[hit_90[0]] - self.t_list[hit_10[0]])
+
+    def report(self):
+        return {
+            "Steady-State Error": self.steady_state_error(),
+            "Overshoot (%)": self.overshoot(),
+            "Settling Time (s)": self.settling_time(),
+            "Rise Time (s)": self.rise_time()
+        }
+
+
+class OnlineControlEvaluator:
+    """
+    流式控制性能评估：update() 逐点累积，O(1) 时间与内存，不保存历史
+    - 超调：运行最大值
+    - 上升时间：10% / 90% 首次穿越时刻
+    - 稳态误差：最近 window 个点的滑动平均绝对误差
+    - 调节时间：最近一次超出误差带之后的第一个点的时刻
+    report() 随时可调用，结果与对同一序列调用 ControlEvaluator.report() 相同
+    """
+
+    def __init__(self, ref_value, tolerance=0.01, window=10):
+        self.ref = ref_value
+        self.tol = tolerance
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.y0 = None
+        self.peak = -np.inf
+        self.t_10 = None
+        self.t_90 = None
+        self.settle_t = None
+        self._errs = deque(maxlen=self.window)
+
+    def update(self, t, y):
+        y = float(y)
+        if self.count == 0:
+            self.y0 = y
+        self.count += 1
+
+        if not np.isnan(self.peak) and (np.isnan(y) or y > self.peak):
+            self.peak = y  # 与 np.max 一致：出现 NaN 后保持 NaN
+        self._errs.append(abs(y - self.ref))
+
+        if self.t_90 is None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                y_norm = np.float64(y - self.y0) / np.float64(self.ref - self.y0)
+            if self.t_10 is None and y_norm >= 0.1:
+                self.t_10 = t
+            if y_norm >= 0.9:
+                self.t_90 = t
+
+        if abs(y - self.ref) < self.tol * self.ref:
+            if self.settle_t is None:
+                self.settle_t = t
+        else:
+            self.settle_t = None
+
+    def steady_state_error(self):
+        return float(np.mean(self._errs)) if self._errs else float('nan')
+
+    def overshoot(self):
+        return float((self.peak - self.ref) / self.ref * 100)
+
+    def settling_time(self):
+        return None if self.settle_t is None else float(self.settle_t)
 
     def rise_time(self):
-        y_norm = (self.y_list - self.y_list[0]) / (self.ref - self.y_list[0])
-        t_10 = next((t for t, y in zip(self.t_list, y_norm) if y >= 0.1), None)
-        t_90 = next((t for t, y in zip(self.t_list, y_norm) if y >= 0.9), None)
-        return float(t_90 - t_10) if t_10 and t_90 else None
+        if self.t_10 is None or self.t_90 is None:
+            return None
+        return float(self.t_90 - self.t_10)
 
     def report(self):
         return {
@@ -1,14 +1,29 @@
 import os
 import csv
+import time
+import queue
+import atexit
 import datetime
+import threading
+
+_STOP = object()
+_FLUSH = object()
+
 
 class SimulationLogger:
     """
     高级仿真日志器：记录数据、事件、控制行为、状态变化
+
+    写入由后台线程完成：主循环只把记录放入有界队列，
+    后台线程批量写入文件，并按 flush_interval 秒或 finalize() 时落盘
+    队列满时主循环等待（不丢行），进程退出时自动 finalize
+    后台线程写入失败（如磁盘已满）时，后续 log_*/flush/finalize 调用抛出 RuntimeError，不会无限等待
     """
 
-    def __init__(self, output_dir="outputs"):
+    def __init__(self, output_dir="outputs", maxsize=10000, batch_size=512, flush_interval=1.0):
         self.output_dir = output_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
         os.makedirs(self.output_dir, exist_ok=True)
 
         # 准备文件路径
@@ -16,28 +31,149 @@ class SimulationLogger:
         self.event_file = os.path.join(self.output_dir, "event_log.txt")
         self.control_file = os.path.join(self.output_dir, "control_trace.csv")
 
+        # 文件在整个运行期保持打开，仅由后台线程写入
+        self._data_f = open(self.data_file, 'w', newline='')
+        self._control_f = open(self.control_file, 'w', newline='')
+        self._event_f = open(self.event_file, 'w')
+        self._writers = {
+            'data': csv.writer(self._data_f),
+            'control': csv.writer(self._control_f),
+        }
+
         # 写入头
-        with open(self.data_file, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(["Step", "Time(s)", "T_out(K)", "n", "rho", "U", "SCRAM"])
-        with open(self.control_file, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(["Step", "Mode", "T_out", "Error_T", "U", "Error_n", "rho", "SCRAM"])
-        with open(self.event_file, 'w') as f:
-            f.write(f"=== Simulation Log Started at {datetime.datetime.now()} ===\n")
+        self._writers['data'].writerow(["Step", "Time(s)", "T_out(K)", "n", "rho", "U", "SCRAM"])
+        self._writers['control'].writerow(["Step", "Mode", "T_out", "Error_T", "U", "Error_n", "rho", "SCRAM"])
+        self._event_f.write(f"=== Simulation Log Started at {datetime.datetime.now()} ===\n")
+
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._closed = False
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="SimulationLogger", daemon=True)
+        self._thread.start()
+        atexit.register(self.finalize)
 
     def log_data(self, step, time_s, T_out, n, rho, U, scram):
-        with open(self.data_file, 'a', newline='') as f:
-            csv.writer(f).writerow([step, time_s, T_out, n, rho, U, int(scram)])
+        self._put(('data', [step, time_s, T_out, n, rho, U, int(scram)]))
 
-    def log_control(self, step, mode, error_T, U, error_n, rho, scram):
-        with open(self.control_file, 'a', newline='') as f:
-            csv.writer(f).writerow([step, mode, f"{T_out:.2f}", f"{error_T:.3f}", f"{U:.1f}", f"{error_n:.3f}", f"{rho:.5f}", int(scram)])
+    def log_control(self, step, mode, T_out, error_T, U, error_n, rho, scram):
+        self._put(('control', [step, mode, f"{T_out:.2f}", f"{error_T:.3f}", f"{U:.1f}", f"{error_n:.3f}", f"{rho:.5f}", int(scram)]))
 
     def log_event(self, message):
-        with open(self.event_file, 'a') as f:
-            f.write(f"[{datetime.datetime.now()}] {message}\n")
+        self._put(('event', f"[{datetime.datetime.now()}] {message}\n"))
+
+    def flush(self):
+        """
+        等待队列中已提交的记录全部写入并落盘
+        """
+        if self._closed:
+            return
+        done = threading.Event()
+        self._enqueue((_FLUSH, done))
+        while not done.wait(0.1):
+            if not self._thread.is_alive():
+                break
+        self._check()
 
     def finalize(self):
-        with open(self.event_file, 'a') as f:
-            f.write(f"=== Simulation Ended at {datetime.datetime.now()} ===\n")
+        if self._closed:
+            return
+        try:
+            if self._error is None:
+                self._enqueue((_STOP, None))
+                while self._thread.is_alive():
+                    self._thread.join(0.1)
+            if self._error is None:
+                self._event_f.write(f"=== Simulation Ended at {datetime.datetime.now()} ===\n")
+        finally:
+            self._closed = True
+            for f in (self._data_f, self._control_f, self._event_f):
+                try:
+                    f.close()
+                except OSError:
+                    pass
+        self._check()
+
+    def _put(self, item):
+        if self._closed:
+            raise RuntimeError("SimulationLogger 已 finalize，无法继续写入")
+        self._enqueue(item)
+
+    def _enqueue(self, item):
+        """放入队列；队列已满时等待，但后台线程已退出时立即报错而不是永久阻塞"""
+        self._check()
+        while True:
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if not self._thread.is_alive():
+                    self._check()
+                    raise RuntimeError("SimulationLogger 后台写线程已退出")
+
+    def _check(self):
+        if self._error is not None:
+            raise RuntimeError(f"SimulationLogger 后台写入失败: {self._error!r}") from self._error
+
+    def _write_batch(self, batch):
+        for kind, payload in batch:
+            if kind == 'event':
+                self._event_f.write(payload)
+            else:
+                self._writers[kind].writerow(payload)
+
+    def _flush_files(self):
+        for f in (self._data_f, self._control_f, self._event_f):
+            f.flush()
+
+    def _run(self):
+        """
+        后台写线程：异常时记录错误并释放等待中的 flush()，由调用方线程重新抛出
+        """
+        try:
+            self._loop()
+        except Exception as e:
+            self._error = e
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item[0] is _FLUSH:
+                    item[1].set()
+
+    def _loop(self):
+        """
+        阻塞取出一条后尽量多取，凑批写入
+        """
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._flush_files()
+                last_flush = time.monotonic()
+                continue
+
+            batch = []
+            control = None
+            while True:
+                if item[0] is _STOP or item[0] is _FLUSH:
+                    control = item
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._write_batch(batch)
+
+            if control is not None or time.monotonic() - last_flush >= self.flush_interval:
+                self._flush_files()
+                last_flush = time.monotonic()
+            if control is not None:
+                if control[0] is _STOP:
+                    return
+                control[1].set()
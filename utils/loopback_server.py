@@ -0,0 +1,123 @@
+"""
+本地回环测试服务器 — 接收 SocketPublisher 发布的帧并统计发布速率
+
+用法：
+    python -m utils.loopback_server --port 9999 --interval 1.0
+"""
+
+import json
+import time
+import socket
+import struct
+import argparse
+import threading
+
+from core.io_interface import FRAME_HEADER, DATA_HEADER
+
+
+def _recv_exact(conn, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = conn.recv(n - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return bytes(buf)
+
+
+class LoopbackServer:
+    """
+    单连接顺序服务的回环服务器，按 interval 秒打印帧速率、序号丢失数与最新数据
+    """
+
+    def __init__(self, host="127.0.0.1", port=9999, interval=1.0, verbose=True):
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.verbose = verbose
+        self.frames = 0
+        self.text_frames = 0
+        self.gaps = 0
+        self.connections = 0
+        self.channels = []
+        self.last = None
+        self._running = False
+        self._sock = None
+
+    def start(self):
+        """在后台线程中启动服务器，返回实际监听端口（port=0 时由系统分配）"""
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen(1)
+        self._sock.settimeout(0.2)
+        self.port = self._sock.getsockname()[1]
+        self._running = True
+        threading.Thread(target=self.serve, daemon=True).start()
+        return self.port
+
+    def stop(self):
+        self._running = False
+
+    def serve(self):
+        while self._running:
+            try:
+                conn, _ = self._sock.accept()
+            except socket.timeout:
+                continue
+            self.connections += 1
+            with conn:
+                self._handle(conn)
+        self._sock.close()
+
+    def _handle(self, conn):
+        data_struct = struct.Struct("!")
+        expected_seq = None
+        window_frames, window_start = 0, time.perf_counter()
+        while self._running:
+            head = _recv_exact(conn, FRAME_HEADER.size)
+            if head is None:
+                return
+            length, kind = FRAME_HEADER.unpack(head)
+            body = _recv_exact(conn, length - 1)
+            if body is None:
+                return
+
+            if kind == ord('H'):
+                self.channels = json.loads(body)["channels"]
+                data_struct = struct.Struct("!" + "d" * len(self.channels))
+                expected_seq = None
+            elif kind == ord('D'):
+                seq, t = DATA_HEADER.unpack_from(body)
+                values = data_struct.unpack_from(body, DATA_HEADER.size)
+                if expected_seq is not None and seq != expected_seq:
+                    self.gaps += (seq - expected_seq) & 0xFFFFFFFF
+                expected_seq = (seq + 1) & 0xFFFFFFFF
+                self.last = (t, dict(zip(self.channels, values)))
+                self.frames += 1
+                window_frames += 1
+            elif kind == ord('T'):
+                self.text_frames += 1
+
+            elapsed = time.perf_counter() - window_start
+            if elapsed >= self.interval:
+                if self.verbose:
+                    print(f"[LoopbackServer] {window_frames / elapsed:10.1f} frames/s  "
+                          f"total={self.frames} lost={self.gaps} last={self.last}")
+                window_frames, window_start = 0, time.perf_counter()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SocketPublisher 本地回环测试服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9999)
+    parser.add_argument("--interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = LoopbackServer(args.host, args.port, args.interval)
+    print(f"[LoopbackServer] listening on {args.host}:{server.start()}")
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,250 @@
+"""
+ResultsStore 模块 — 自描述二进制结果容器（.msrb）
+
+文件布局（小端）：
+    b"MSRB" + u32 版本号
+    若干数据块：b"CHNK" + u32 头长度 + JSON 头 + 数据载荷
+    结束索引（finalize 时写入）：b"INDX" + JSON 索引 + u64 索引位置 + b"MSRE"
+
+每个数据块包含：
+    - "__time__" 时间索引：本块覆盖的仿真步号与对应时刻
+    - 各变量按列存放的步号 (int64) 与数值（标量或定形数组），块内按步号排序
+
+读取时只解析块头，按时间窗口定位相关块，再按字节偏移读取所需变量的行范围，
+不加载文件其余部分。未写结束索引的文件（仿真进行中或异常中断）可顺序扫描块头读取。
+"""
+
+import os
+import json
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+MAGIC = b"MSRB"
+VERSION = 1
+CHUNK_TAG = b"CHNK"
+INDEX_TAG = b"INDX"
+END_TAG = b"MSRE"
+TIME_KEY = "__time__"
+
+Channel = namedtuple("Channel", ["t", "values"])
+
+
+class ResultsWriter:
+    """
+    增量写入结果容器：每次 write_chunk() 追加一个数据块，close() 写入结束索引
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._f = open(path, 'wb')
+        self._f.write(MAGIC + struct.pack("<I", VERSION))
+        self._chunks = []
+
+    def write_chunk(self, steps, times, channels):
+        """
+        追加一个数据块
+
+        参数：
+        - steps, times: 本块覆盖的仿真步号与时刻（时间索引）
+        - channels: {key: (steps, values)}，values 第一维与 steps 对齐
+        """
+        columns = {TIME_KEY: (np.asarray(steps, dtype=np.int64), np.asarray(times, dtype=np.float64))}
+        for key, (ch_steps, values) in channels.items():
+            ch_steps = np.asarray(ch_steps, dtype=np.int64)
+            if ch_steps.size == 0:
+                continue
+            values = np.asarray(values)
+            if values.dtype == bool:
+                values = values.astype(np.int8)
+            order = np.argsort(ch_steps, kind='stable')
+            columns[key] = (ch_steps[order], values[order])
+
+        header = {"s0": None, "s1": None, "t0": None, "t1": None, "channels": {}}
+        payload = []
+        offset = 0
+        for key, (ch_steps, values) in columns.items():
+            values = np.ascontiguousarray(values)
+            steps_bytes = ch_steps.astype("<i8").tobytes()
+            values_bytes = values.astype(values.dtype.newbyteorder("<")).tobytes()
+            header["channels"][key] = {
+                "n": int(ch_steps.size),
+                "dtype": values.dtype.newbyteorder("<").str,
+                "shape": list(values.shape[1:]),
+                "s0": int(ch_steps[0]),
+                "s1": int(ch_steps[-1]),
+                "steps_off": offset,
+                "values_off": offset + len(steps_bytes),
+            }
+            payload += [steps_bytes, values_bytes]
+            offset += len(steps_bytes) + len(values_bytes)
+
+        all_s0 = [c["s0"] for c in header["channels"].values()]
+        all_s1 = [c["s1"] for c in header["channels"].values()]
+        header["s0"], header["s1"] = min(all_s0), max(all_s1)
+        time_steps, time_vals = columns[TIME_KEY]
+        if time_vals.size:
+            header["t0"], header["t1"] = float(time_vals[0]), float(time_vals[-1])
+        header["payload"] = offset
+
+        header_bytes = json.dumps(header).encode('utf-8')
+        pos = self._f.tell()
+        self._f.write(CHUNK_TAG + struct.pack("<I", len(header_bytes)) + header_bytes)
+        for part in payload:
+            self._f.write(part)
+        self._f.flush()
+        self._chunks.append([pos, len(header_bytes)])
+
+    def close(self):
+        if self._f.closed:
+            return
+        index_pos = self._f.tell()
+        index_bytes = json.dumps({"chunks": self._chunks}).encode('utf-8')
+        self._f.write(INDEX_TAG + index_bytes + struct.pack("<Q", index_pos) + END_TAG)
+        self._f.close()
+
+
+class ResultsReader:
+    """
+    结果容器读取器：仅读取块头建立索引，load() 按时间窗口惰性读取所需变量
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.chunks = []        # [(payload_pos, header_dict), ...]
+        self.finalized = False
+        self._scan_pos = 8
+        with open(path, 'rb') as f:
+            if f.read(4) != MAGIC:
+                raise ValueError(f"Not a MSRB results file: {path}")
+            self.version = struct.unpack("<I", f.read(4))[0]
+        self.refresh()
+
+    def refresh(self):
+        """
+        读取新追加的数据块头（用于跟踪运行中的仿真），返回新块数量
+        """
+        if self.finalized:
+            return 0
+        count = 0
+        with open(self.path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if self._scan_pos == 8 and size >= 20:
+                f.seek(size - 12)
+                tail = f.read(12)
+                if tail[8:] == END_TAG:
+                    index_pos = struct.unpack("<Q", tail[:8])[0]
+                    f.seek(index_pos + len(INDEX_TAG))
+                    index = json.loads(f.read(size - 12 - index_pos - len(INDEX_TAG)))
+                    for pos, hlen in index["chunks"]:
+                        f.seek(pos + 8)
+                        header = json.loads(f.read(hlen))
+                        self.chunks.append((pos + 8 + hlen, header))
+                    self.finalized = True
+                    return len(self.chunks)
+
+            while self._scan_pos + 8 <= size:
+                f.seek(self._scan_pos)
+                tag = f.read(4)
+                if tag == INDEX_TAG:
+                    self.finalized = True
+                    break
+                if tag != CHUNK_TAG:
+                    raise ValueError(f"Corrupt MSRB chunk at byte {self._scan_pos}")
+                hlen = struct.unpack("<I", f.read(4))[0]
+                if self._scan_pos + 8 + hlen > size:
+                    break
+                header = json.loads(f.read(hlen))
+                end = self._scan_pos + 8 + hlen + header["payload"]
+                if end > size:
+                    break  # 块尚未写完整
+                self.chunks.append((self._scan_pos + 8 + hlen, header))
+                self._scan_pos = end
+                count += 1
+        return count
+
+    def keys(self):
+        names = []
+        for _, header in self.chunks:
+            for key in header["channels"]:
+                if key != TIME_KEY and key not in names:
+                    names.append(key)
+        return names
+
+    def time_range(self):
+        t = [(h["t0"], h["t1"]) for _, h in self.chunks if h["t0"] is not None]
+        if not t:
+            return None
+        return min(a for a, _ in t), max(b for _, b in t)
+
+    def _read_rows(self, f, payload_pos, meta, lo=None, hi=None):
+        """
+        读取某块内单个变量的 [lo, hi) 步号范围（块内已按步号排序）
+        """
+        n = meta["n"]
+        f.seek(payload_pos + meta["steps_off"])
+        steps = np.frombuffer(f.read(8 * n), dtype="<i8")
+        i0 = 0 if lo is None else int(np.searchsorted(steps, lo, side='left'))
+        i1 = n if hi is None else int(np.searchsorted(steps, hi, side='left'))
+        dtype = np.dtype(meta["dtype"])
+        shape = tuple(meta["shape"])
+        row_bytes = dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+        f.seek(payload_pos + meta["values_off"] + i0 * row_bytes)
+        values = np.frombuffer(f.read((i1 - i0) * row_bytes), dtype=dtype)
+        return steps[i0:i1], values.reshape((i1 - i0,) + shape)
+
+    def load(self, keys, t0=None, t1=None):
+        """
+        读取时间窗口 [t0, t1] 内的变量
+
+        返回：{key: Channel(t, values)}，按时间排序
+        """
+        if isinstance(keys, str):
+            keys = [keys]
+        lo_t = -np.inf if t0 is None else t0
+        hi_t = np.inf if t1 is None else t1
+
+        with open(self.path, 'rb') as f:
+            # 1) 时间索引：步号窗口
+            idx_steps, idx_times = [], []
+            for payload_pos, header in self.chunks:
+                if header["t0"] is None or header["t1"] < lo_t or header["t0"] > hi_t:
+                    continue
+                s, t = self._read_rows(f, payload_pos, header["channels"][TIME_KEY])
+                idx_steps.append(s)
+                idx_times.append(t)
+            if not idx_steps:
+                return {key: Channel(np.empty(0), np.empty(0)) for key in keys}
+            idx_steps = np.concatenate(idx_steps)
+            idx_times = np.concatenate(idx_times)
+            order = np.argsort(idx_steps, kind='stable')
+            idx_steps, idx_times = idx_steps[order], idx_times[order]
+            inside = (idx_times >= lo_t) & (idx_times <= hi_t)
+            if not inside.any():
+                return {key: Channel(np.empty(0), np.empty(0)) for key in keys}
+            s_lo = int(idx_steps[inside][0])
+            s_hi = int(idx_steps[inside][-1]) + 1
+
+            # 2) 各变量：只读与步号窗口重叠的块与行
+            out = {}
+            for key in keys:
+                parts_s, parts_v = [], []
+                for payload_pos, header in self.chunks:
+                    meta = header["channels"].get(key)
+                    if meta is None or meta["s1"] < s_lo or meta["s0"] >= s_hi:
+                        continue
+                    s, v = self._read_rows(f, payload_pos, meta, s_lo, s_hi)
+                    parts_s.append(s)
+                    parts_v.append(v)
+                if not parts_s:
+                    out[key] = Channel(np.empty(0), np.empty(0))
+                    continue
+                steps = np.concatenate(parts_s)
+                values = np.concatenate(parts_v)
+                order = np.argsort(steps, kind='stable')
+                steps, values = steps[order], values[order]
+                pos = np.clip(np.searchsorted(idx_steps, steps), 0, len(idx_steps) - 1)
+                out[key] = Channel(idx_times[pos], values)
+        return out
@@ -0,0 +1,76 @@
+"""
+启动开销检查 — 测量仿真入口的冷启动时间，并确认重型依赖未在启动路径上被导入
+
+每次测量在独立的子解释器中执行 `import main`、load_input_card()（第二次起命中已解析输入卡缓存）
+与单步 run_simulation()（覆盖控制器/MPC 构造等真实初始化路径），取多次测量的中位数与预算比较；
+超出预算或出现禁止导入的模块时以非零状态退出，
+可直接放入批量计算前的检查脚本或 CI 中。
+
+用法：
+    python -m utils.startup_budget --budget 0.5 --repeat 5
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+import time
+
+# 启动路径上不应出现的模块（只在导出 CSV、绘图、Socket 发布、解析 YAML 时按需加载）
+FORBIDDEN = ("pandas", "matplotlib", "scipy", "yaml", "socket")
+
+_PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import main
+from core.input_parser import load_input_card
+params = load_input_card({card!r})
+params['meta']['t_end'] = params['hydraulics']['dt']
+main.run_simulation(params)
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"elapsed": elapsed, "modules": sorted(m for m in {forbidden!r} if m in sys.modules)}}))
+"""
+
+
+def measure(card="input_card.yaml", repeat=5, cwd=None):
+    """
+    返回 (各次启动耗时列表（含解释器启动）, 各次导入、读卡与单步推进耗时列表, 启动路径上出现的禁止模块)
+    """
+    cwd = cwd or os.getcwd()
+    code = _PROBE.format(card=card, forbidden=FORBIDDEN)
+    # 预热一次（生成输入卡缓存、字节码），不计入测量
+    subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, check=True)
+    totals, imports, modules = [], [], set()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True)
+        totals.append(time.perf_counter() - t0)
+        probe = json.loads(out.stdout.strip().splitlines()[-1])
+        imports.append(probe["elapsed"])
+        modules.update(probe["modules"])
+    return totals, imports, sorted(modules)
+
+
+def check(budget=0.5, card="input_card.yaml", repeat=5, cwd=None):
+    """
+    启动预算检查：中位数冷启动时间不超过 budget (s) 且启动路径不含 FORBIDDEN 模块时返回 True
+    """
+    totals, imports, modules = measure(card, repeat, cwd)
+    median = sorted(totals)[len(totals) // 2]
+    median_import = sorted(imports)[len(imports) // 2]
+    ok = median <= budget and not modules
+    print(f"启动耗时中位数: {median * 1e3:.1f} ms（其中导入、读卡与单步推进 {median_import * 1e3:.1f} ms），"
+          f"预算 {budget * 1e3:.0f} ms {'✅' if median <= budget else '❌'}")
+    if modules:
+        print(f"❌ 启动路径导入了重型依赖: {', '.join(modules)}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="仿真入口启动开销检查")
+    parser.add_argument("--budget", type=float, default=0.5, help="冷启动时间预算 (s)")
+    parser.add_argument("--card", default="input_card.yaml")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(0 if check(args.budget, args.card, args.repeat) else 1)
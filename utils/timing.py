@@ -0,0 +1,133 @@
+"""
+实时运行支持 — 墙钟节拍控制（Pacer）与分阶段耗时统计（StageTimer）
+
+输入卡：
+--------------------------------------------------
+meta:
+  run_mode: paced        # asap：尽快推进；paced：按墙钟节拍推进
+  speed_factor: 1.0      # 仿真时间 / 墙钟时间，2.0 表示两倍实时
+  spin_time: 0.002       # 截止时刻前最后一段改为忙等（s），抵消 sleep 的唤醒抖动
+--------------------------------------------------
+"""
+
+import time
+
+import numpy as np
+
+STAGES = ("control", "kinetics", "thermal", "hydraulics", "io")
+
+
+class StageTimer:
+    """
+    分阶段计时：每步 start() 后在各阶段结束处调用 lap(stage)，stop() 结束一步
+    同一阶段在一步内可多次计时（如控制前后的记录/设定值读取都计入 io），按步累加后
+    记录每个阶段与整步的最大耗时（最坏情况延迟）与累计耗时
+    """
+
+    def __init__(self, stages=STAGES):
+        self.stages = tuple(stages)
+        self.reset()
+
+    def reset(self):
+        self.worst = dict.fromkeys(self.stages, 0.0)
+        self.total = dict.fromkeys(self.stages, 0.0)
+        self.worst_step = 0.0
+        self.worst_step_index = None
+        self.steps = 0
+        self._current = dict.fromkeys(self.stages, 0.0)
+        self._t_step = self._t_last = None
+        self._step = None
+
+    def start(self, step=None):
+        self._step = step
+        self._t_step = self._t_last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        dt = now - self._t_last
+        self._t_last = now
+        self._current[stage] += dt
+        return dt
+
+    def stop(self):
+        """结束一步，返回整步耗时"""
+        latency = self._t_last - self._t_step
+        current = self._current
+        for stage, dt in current.items():
+            self.total[stage] += dt
+            if dt > self.worst[stage]:
+                self.worst[stage] = dt
+            current[stage] = 0.0
+        self.steps += 1
+        if latency > self.worst_step:
+            self.worst_step = latency
+            self.worst_step_index = self._step
+        return latency
+
+    def report(self):
+        n = max(self.steps, 1)
+        return {
+            "steps": self.steps,
+            "worst_step (ms)": self.worst_step * 1e3,
+            "worst_step_index": self.worst_step_index,
+            "worst (ms)": {k: v * 1e3 for k, v in self.worst.items()},
+            "mean (ms)": {k: v / n * 1e3 for k, v in self.total.items()},
+        }
+
+
+class Pacer:
+    """
+    墙钟节拍器：第 step 步的截止时刻为 t0 + (step + 1)·dt / speed_factor
+
+    wait(step) 在每步计算完成后调用：记录裕量（截止时刻 - 当前时刻，负值为超时），
+    裕量为正时先 sleep 到截止前 spin_time，再忙等到截止时刻。
+    超时后不重置时间基准，后续步骤按原节拍追赶，保证仿真时间与墙钟不漂移
+    """
+
+    def __init__(self, dt, speed_factor=1.0, spin_time=0.002, capacity=0):
+        if speed_factor <= 0:
+            raise ValueError("speed_factor must be positive")
+        self.period = dt / speed_factor
+        self.spin_time = spin_time
+        self.slack = np.zeros(capacity)
+        self.reset()
+
+    def reset(self):
+        self.t0 = None
+        self.misses = 0
+        self.count = 0
+        self.worst_slack = np.inf
+
+    def start(self):
+        self.t0 = time.perf_counter()
+
+    def wait(self, step):
+        if self.t0 is None:
+            self.start()
+        deadline = self.t0 + (step + 1) * self.period
+        slack = deadline - time.perf_counter()
+
+        if self.count < self.slack.size:
+            self.slack[self.count] = slack
+        self.count += 1
+        if slack < self.worst_slack:
+            self.worst_slack = slack
+        if slack < 0:
+            self.misses += 1
+            return slack
+
+        if slack > self.spin_time:
+            time.sleep(slack - self.spin_time)
+        while time.perf_counter() < deadline:
+            pass
+        return slack
+
+    def report(self):
+        slack = self.slack[:min(self.count, self.slack.size)]
+        return {
+            "steps": self.count,
+            "deadline_misses": self.misses,
+            "worst_slack (ms)": self.worst_slack * 1e3 if self.count else None,
+            "mean_slack (ms)": float(slack.mean()) * 1e3 if slack.size else None,
+            "p01_slack (ms)": float(np.percentile(slack, 1)) * 1e3 if slack.size else None,
+        }
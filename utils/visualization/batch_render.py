@@ -0,0 +1,276 @@
+"""
+批量渲染 — 在无显示环境下（Agg 后端）并行渲染整个参数扫描目录的曲线图与场动画
+
+扫描目录下每个包含 results.msrb、results/scalars.csv 或 *.npy 的子目录视为一个算例：
+    - 概览图：标量时间序列（n、T_out、rho、U ...）分子图绘制，每个算例一张
+    - 场帧序列：{key}.npy 中的场历史（1D 曲线或 2D 云图）逐帧输出 PNG，可选合成动画
+场历史以 np.load(mmap_mode='r') 打开，只读取被渲染的帧；标量优先从 .msrb 结果容器按变量读取。
+所有工作都在同一进程池中完成，工作进程启动时切换到 Agg 后端：
+先并行执行概览图与各场的帧选择/坐标范围统计，每个场统计完成后立即提交其帧序列（按帧分段）与动画任务。
+
+用法：
+    python -m utils.visualization.batch_render outputs/sweep --fields T_core --max-frames 200 --jobs 8
+    python -m utils.visualization.batch_render outputs/sweep --animate --fps 20
+"""
+
+import os
+import argparse
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from utils.results_store import ResultsReader
+
+SUMMARY_KEYS = ("n", "T_out", "rho", "U")
+FIGURE_DIR = "figures"
+
+
+def find_runs(root):
+    """
+    返回 root 下所有算例目录（含 root 本身），按路径排序
+    """
+    runs = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d != FIGURE_DIR)
+        if ("results.msrb" in filenames or any(f.endswith(".npy") for f in filenames)
+                or os.path.isfile(os.path.join(dirpath, "results", "scalars.csv"))):
+            runs.append(dirpath)
+    return sorted(runs)
+
+
+def load_scalars(run_dir, keys=SUMMARY_KEYS):
+    """
+    读取算例的标量时间序列 {key: (t, values)}：优先结果容器，其次 results/scalars.csv
+    """
+    store = os.path.join(run_dir, "results.msrb")
+    if os.path.isfile(store):
+        reader = ResultsReader(store)
+        keys = [k for k in keys if k in reader.keys()]
+        return {k: (ch.t, ch.values) for k, ch in reader.load(keys).items()}
+
+    csv_path = os.path.join(run_dir, "results", "scalars.csv")
+    if not os.path.isfile(csv_path):
+        return {}
+    table = np.genfromtxt(csv_path, delimiter=',', names=True, dtype=float)
+    names = table.dtype.names
+    t = table["time"] if "time" in names else table[names[0]]
+    return {k: (t, table[k]) for k in keys if k in names}
+
+
+def load_field(run_dir, key, dt=None):
+    """
+    以内存映射方式打开场历史 {key}.npy，返回 (各帧时刻或步号, 帧数组)
+    配置了记录策略的变量使用 {key}_steps.npy 中的步号；dt 给定时换算为时刻
+    """
+    frames = np.load(os.path.join(run_dir, f"{key}.npy"), mmap_mode='r')
+    steps_path = os.path.join(run_dir, f"{key}_steps.npy")
+    steps = np.load(steps_path) if os.path.isfile(steps_path) else np.arange(len(frames))
+    return (steps * dt if dt else steps), frames
+
+
+def select_frames(n, max_frames=None, every=1):
+    """
+    帧下标：每 every 帧取一帧，总数超过 max_frames 时再均匀抽取
+    """
+    idx = np.arange(0, n, max(1, every))
+    if max_frames and idx.size > max_frames:
+        idx = idx[np.linspace(0, idx.size - 1, max_frames).round().astype(int)]
+    return idx
+
+
+def _field_limits(frames, idx, block=256):
+    """所选帧的全局数值范围（固定坐标轴/色标，帧间可比），按块读取内存映射"""
+    lo, hi = np.inf, -np.inf
+    for start in range(0, idx.size, block):
+        values = np.asarray(frames[idx[start:start + block]], dtype=float)
+        finite = values[np.isfinite(values)]
+        if finite.size:
+            lo, hi = min(lo, finite.min()), max(hi, finite.max())
+    if not np.isfinite(lo):
+        lo, hi = 0.0, 1.0
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    return lo, hi
+
+
+def plan_field(run_dir, out_dir, key, max_frames=None, every=1):
+    """
+    场渲染准备（在工作进程中执行）：选帧并统计坐标范围，返回 (run_dir, out_dir, key, idx, limits)；无帧时返回 None
+    """
+    _, field = load_field(run_dir, key)
+    idx = select_frames(len(field), max_frames, every)
+    if idx.size == 0:
+        return None
+    return run_dir, out_dir, key, idx, _field_limits(field, idx)
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _out_dir(run_dir, root, out_root):
+    if out_root is None:
+        path = os.path.join(run_dir, FIGURE_DIR)
+    else:
+        path = os.path.join(out_root, os.path.relpath(run_dir, root))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def render_summary(run_dir, out_dir, keys=SUMMARY_KEYS, fmt="png", dpi=100):
+    """
+    算例概览图：每个标量一个子图，共享时间轴
+    """
+    import matplotlib.pyplot as plt
+    data = load_scalars(run_dir, keys)
+    if not data:
+        return []
+    fig, axes = plt.subplots(len(data), 1, figsize=(8, 2.2 * len(data)), sharex=True, squeeze=False)
+    for ax, (key, (t, y)) in zip(axes[:, 0], data.items()):
+        ax.plot(t, y, lw=0.8)
+        ax.set_ylabel(key)
+        ax.grid(True)
+    axes[-1, 0].set_xlabel("时间 (s)")
+    fig.suptitle(os.path.basename(os.path.abspath(run_dir)))
+    fig.tight_layout()
+    path = os.path.join(out_dir, f"summary.{fmt}")
+    fig.savefig(path, dpi=dpi)
+    plt.close(fig)
+    return [path]
+
+
+def _draw_field(ax, frame, limits):
+    """创建场的绘图对象：1D 为曲线，2D 为云图；返回可逐帧更新的 artist"""
+    if frame.ndim == 1:
+        (artist,) = ax.plot(np.arange(frame.size), frame)
+        ax.set_ylim(*limits)
+        ax.set_xlabel("节点")
+        ax.grid(True)
+    else:
+        artist = ax.imshow(frame, origin='lower', aspect='auto', vmin=limits[0], vmax=limits[1], cmap='inferno')
+        ax.figure.colorbar(artist, ax=ax)
+    return artist
+
+
+def _update_field(artist, frame):
+    if frame.ndim == 1:
+        artist.set_ydata(frame)
+    else:
+        artist.set_data(frame)
+
+
+def render_field_frames(run_dir, out_dir, key, idx, limits, dt=None, fmt="png", dpi=100):
+    """
+    渲染场历史的一段帧为图像序列 {key}_{帧号}.{fmt}；图窗只创建一次，逐帧更新数据
+    """
+    import matplotlib.pyplot as plt
+    labels, frames = load_field(run_dir, key, dt)
+    unit = "s" if dt else "step"
+    fig, ax = plt.subplots(figsize=(6, 4))
+    artist = _draw_field(ax, np.asarray(frames[idx[0]]), limits)
+    paths = []
+    for i in idx:
+        _update_field(artist, np.asarray(frames[i]))
+        ax.set_title(f"{key}  {unit} = {labels[i]:g}")
+        path = os.path.join(out_dir, f"{key}_{i:06d}.{fmt}")
+        fig.savefig(path, dpi=dpi)
+        paths.append(path)
+    plt.close(fig)
+    return paths
+
+
+def render_field_animation(run_dir, out_dir, key, idx, limits, dt=None, fps=20, dpi=100):
+    """
+    将场历史合成为动画：有 ffmpeg 时输出 mp4，否则输出 gif
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib import animation
+    labels, frames = load_field(run_dir, key, dt)
+    unit = "s" if dt else "step"
+    fig, ax = plt.subplots(figsize=(6, 4))
+    artist = _draw_field(ax, np.asarray(frames[idx[0]]), limits)
+
+    def update(i):
+        _update_field(artist, np.asarray(frames[i]))
+        ax.set_title(f"{key}  {unit} = {labels[i]:g}")
+        return (artist,)
+
+    anim = animation.FuncAnimation(fig, update, frames=list(idx), blit=False)
+    if animation.writers.is_available("ffmpeg"):
+        path, writer = os.path.join(out_dir, f"{key}.mp4"), animation.FFMpegWriter(fps=fps)
+    else:
+        path, writer = os.path.join(out_dir, f"{key}.gif"), animation.PillowWriter(fps=fps)
+    anim.save(path, writer=writer, dpi=dpi)
+    plt.close(fig)
+    return [path]
+
+
+def render_sweep(root, out_root=None, fields=("T_core",), summary_keys=SUMMARY_KEYS, max_frames=None,
+                 every=1, frames=True, animate=False, fps=20, dt=None, fmt="png", dpi=100,
+                 chunk_frames=50, jobs=None):
+    """
+    并行渲染 root 下所有算例
+
+    参数：
+    - out_root: 输出根目录；缺省时写入各算例目录下的 figures/
+    - fields: 需要渲染的场变量（对应 {key}.npy），不存在的自动跳过
+    - max_frames / every: 帧抽取（见 select_frames）
+    - frames / animate: 是否输出图像序列 / 动画
+    - chunk_frames: 图像序列按此帧数切分为独立任务，单个长算例也能占满进程池
+    返回：生成的文件路径列表
+    """
+    if importlib.util.find_spec("matplotlib") is None:
+        raise ImportError("batch rendering requires matplotlib (pip install matplotlib)")
+
+    runs = [(run_dir, _out_dir(run_dir, root, out_root)) for run_dir in find_runs(root)]
+    outputs = []
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count(), initializer=_init_worker) as pool:
+        # 1) 概览图与各场的帧选择/坐标范围统计并行执行
+        futures = [pool.submit(render_summary, run_dir, out_dir, summary_keys, fmt=fmt, dpi=dpi)
+                   for run_dir, out_dir in runs if summary_keys]
+        plans = [pool.submit(plan_field, run_dir, out_dir, key, max_frames, every)
+                 for run_dir, out_dir in runs for key in fields
+                 if os.path.isfile(os.path.join(run_dir, f"{key}.npy"))]
+
+        # 2) 每个场准备完成后立即提交帧序列与动画任务
+        for plan in as_completed(plans):
+            if plan.result() is None:
+                continue
+            run_dir, out_dir, key, idx, limits = plan.result()
+            if frames:
+                for start in range(0, idx.size, chunk_frames):
+                    futures.append(pool.submit(render_field_frames, run_dir, out_dir, key,
+                                               idx[start:start + chunk_frames], limits, dt=dt, fmt=fmt, dpi=dpi))
+            if animate:
+                futures.append(pool.submit(render_field_animation, run_dir, out_dir, key, idx, limits,
+                                           dt=dt, fps=fps, dpi=dpi))
+
+        for future in futures:
+            outputs.extend(future.result())
+    return sorted(outputs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="参数扫描结果批量渲染（无显示环境）")
+    parser.add_argument("root", help="扫描目录（或单个算例目录）")
+    parser.add_argument("--out", default=None, help="输出根目录，缺省写入各算例的 figures/")
+    parser.add_argument("--fields", nargs="*", default=["T_core"])
+    parser.add_argument("--keys", nargs="*", default=list(SUMMARY_KEYS), help="概览图中的标量变量")
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--every", type=int, default=1)
+    parser.add_argument("--no-frames", action="store_true", help="不输出逐帧图像")
+    parser.add_argument("--animate", action="store_true", help="输出动画（mp4 / gif）")
+    parser.add_argument("--fps", type=int, default=20)
+    parser.add_argument("--dt", type=float, default=None, help="时间步长，用于将步号换算为时刻")
+    parser.add_argument("--format", default="png")
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--jobs", type=int, default=None)
+    args = parser.parse_args()
+
+    outputs = render_sweep(args.root, args.out, fields=args.fields, summary_keys=args.keys,
+                           max_frames=args.max_frames, every=args.every, frames=not args.no_frames,
+                           animate=args.animate, fps=args.fps, dt=args.dt, fmt=args.format,
+                           dpi=args.dpi, jobs=args.jobs)
+    print(f"✅ 渲染完成：{len(outputs)} 个文件")
@@ -1,11 +1,14 @@
 import numpy as np
-import pandas as pd
+import io
 import os
 
+from utils.results_store import ResultsReader
+
 def save_array_as_csv(array, filename, labels=None):
     """
     保存 2D 数组为 CSV 文件，支持列标签
     """
+    import pandas as pd
     df = pd.DataFrame(array)
     if labels:
         df.columns = labels
@@ -15,6 +18,7 @@ def save_time_series(data_dict, filename):
     """
     保存时间序列数据为 CSV，数据为字典 {label: [v1, v2, ...]}
     """
+    import pandas as pd
     df = pd.DataFrame(data_dict)
     df.to_csv(filename, index=False)
 
@@ -23,3 +27,56 @@ def make_sure_dir(path):
     确保输出路径存在
     """
     os.makedirs(os.path.dirname(path), exist_ok=True)
+
+def load_results(path, keys, t0=None, t1=None):
+    """
+    从二进制结果容器 (.msrb) 读取时间窗口 [t0, t1] 内的变量
+    返回 {key: Channel(t, values)}，只读取窗口涉及的数据块
+    """
+    return ResultsReader(path).load(keys, t0, t1)
+
+
+def tail_csv(filename, offset=0, columns=None):
+    """
+    从字节偏移 offset 起增量读取 CSV（用于跟踪运行中仍在追加的日志）
+    只解析完整行，返回 (新行 DataFrame, 新偏移, 列名)
+    offset=0 时读取表头，之后调用需传回 columns
+    """
+    import pandas as pd
+    with open(filename, 'rb') as f:
+        f.seek(offset)
+        chunk = f.read()
+    end = chunk.rfind(b'\n') + 1
+    if end == 0:
+        return pd.DataFrame(columns=columns), offset, columns
+    text = chunk[:end].decode('utf-8')
+    if offset == 0:
+        df = pd.read_csv(io.StringIO(text))
+        columns = list(df.columns)
+    else:
+        df = pd.read_csv(io.StringIO(text), header=None, names=columns)
+    return df, offset + end, columns
+
+
+def minmax_decimate(df, max_points=2000):
+    """
+    保留极值的降采样：将数据分为 (max_points - 2) / (2·列数) 个区间，每个区间保留各列的最小值与最大值所在行，
+    连同首末两行总行数不超过 max_points（至少保留每列一个区间）；余数行均匀分摊到各区间
+    尖峰（如 SCRAM 瞬态）不会在显示时被平均掉
+    """
+    n = len(df)
+    if n <= max_points:
+        return df
+    n_bins = max(1, (max_points - 2) // (2 * max(1, len(df.columns))))
+    edges = np.linspace(0, n, n_bins + 1).astype(int)
+    starts, widths = edges[:-1], np.diff(edges)
+    idx = starts[:, None] + np.arange(widths.max())
+    pad = idx >= edges[1:, None]                  # 区间宽度相差至多 1，较窄区间末尾补位
+    idx = np.minimum(idx, n - 1)
+    keep = [np.array([0, n - 1])]
+    for col in df.columns:
+        y = df[col].to_numpy(dtype=float)[idx]
+        invalid = pad | np.isnan(y)
+        keep.append(starts + np.argmin(np.where(invalid, np.inf, y), axis=1))
+        keep.append(starts + np.argmax(np.where(invalid, -np.inf, y), axis=1))
+    return df.iloc[np.unique(np.concatenate(keep))]
@@ -1,10 +1,24 @@
-import matplotlib.pyplot as plt
 import numpy as np
 
-def plot_temperature_profile(T_hist, x, dt, steps, title="温度分布随时间演化"):
+from utils.visualization.output import load_results
+
+
+def _finish(plt, save_path=None, dpi=100):
+    """
+    save_path 为空时弹窗显示；否则保存图像并关闭图窗（无显示环境下使用 Agg 后端）
+    """
+    plt.tight_layout()
+    if save_path is None:
+        plt.show()
+    else:
+        plt.savefig(save_path, dpi=dpi)
+        plt.close()
+
+def plot_temperature_profile(T_hist, x, dt, steps, title="温度分布随时间演化", save_path=None):
     """
     绘制多时间点下的温度沿空间分布（用于1D热工）
     """
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(10,5))
     for t in steps:
         plt.plot(x, T_hist[t], label=f"t={t*dt:.1f}s")
@@ -13,13 +27,13 @@ def plot_temperature_profile(T_hist, x, dt, steps, title="温度分布随时间
     plt.title(title)
     plt.legend()
     plt.grid()
-    plt.tight_layout()
-    plt.show()
+    _finish(plt, save_path)
 
-def plot_dual_loops(T_p_hist, T_s_hist, x, dt, times):
+def plot_dual_loops(T_p_hist, T_s_hist, x, dt, times, save_path=None):
     """
     主副回路温度分布绘图（覆盖）
     """
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(10,5))
     for t in times:
         plt.plot(x, T_p_hist[t], label=f'主回路 t={t*dt:.1f}s', color='orangered')
@@ -29,13 +43,13 @@ def plot_dual_loops(T_p_hist, T_s_hist, x, dt, times):
     plt.title("主-副回路温度演化")
     plt.legend()
     plt.grid()
-    plt.tight_layout()
-    plt.show()
+    _finish(plt, save_path)
 
-def plot_power_curve(p_list, dt, title="堆芯功率随时间变化"):
+def plot_power_curve(p_list, dt, title="堆芯功率随时间变化", save_path=None):
     """
     绘制中子功率时间曲线
     """
+    import matplotlib.pyplot as plt
     t = np.arange(len(p_list)) * dt
     plt.figure(figsize=(8,4))
     plt.plot(t, p_list, label="n(t)", color='green')
@@ -43,5 +57,19 @@ def plot_power_curve(p_list, dt, title="堆芯功率随时间变化"):
     plt.ylabel("归一化功率")
     plt.title(title)
     plt.grid()
-    plt.tight_layout()
-    plt.show()
+    _finish(plt, save_path)
+
+def plot_results_window(path, keys, t0=None, t1=None, title="仿真结果时间窗口", save_path=None):
+    """
+    从结果容器按时间窗口读取标量变量并绘制曲线（无需加载整个结果文件）
+    """
+    import matplotlib.pyplot as plt
+    data = load_results(path, keys, t0, t1)
+    plt.figure(figsize=(10,4))
+    for key, ch in data.items():
+        plt.plot(ch.t, ch.values, label=key)
+    plt.xlabel("时间 (s)")
+    plt.title(title)
+    plt.legend()
+    plt.grid()
+    _finish(plt, save_path)